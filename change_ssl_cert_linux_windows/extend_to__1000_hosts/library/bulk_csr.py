@@ -0,0 +1,359 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Ansible module bulk_csr: generates private keys and CSRs for many hosts in a process pool.
+
+Replaces the per-entry file/openssl_privatekey/openssl_csr loop of generate_csr.yml and
+fortigate_generate_multi_csr.yaml, which runs one 4096 bit key after the other on one core.
+"""
+import csv
+import ipaddress
+import json
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from ansible.module_utils.basic import AnsibleModule, missing_required_lib
+
+try:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+    from cryptography.x509.oid import NameOID
+    HAS_CRYPTOGRAPHY = True
+    CRYPTOGRAPHY_IMPORT_ERROR = None
+except ImportError:
+    HAS_CRYPTOGRAPHY = False
+    CRYPTOGRAPHY_IMPORT_ERROR = traceback.format_exc()
+
+DOCUMENTATION = r'''
+---
+module: bulk_csr
+short_description: Generate private keys and CSRs for many hosts in parallel
+description:
+  - Reads the CSR definitions once, from I(src) (JSON or CSV) or from I(definitions), and validates
+    all of them before anything is written.
+  - Generates the missing private keys and CSRs in a pool of worker processes, so all CPU cores are used.
+  - Entries whose key and CSR already match their definition are skipped. A key is regenerated if its
+    type or size differ from the definition, a CSR if its subject, SANs or public key differ.
+  - Writes C(<base_output_directory>/<common_name>/<common_name>.key) and C(.csr), like the
+    M(community.crypto.openssl_privatekey) and M(community.crypto.openssl_csr) tasks it replaces.
+options:
+  src:
+    description:
+      - JSON file with a list of CSR definitions, or CSV file with one definition per row
+        (C(subject_alt_names) comma separated). See C(example.json).
+      - Either I(src) or I(definitions) is required.
+    type: path
+  definitions:
+    description:
+      - List of CSR definitions, e.g. the C(csr_definitions) of fortigate_generate_multi_csr.yaml.
+      - Required fields are C(common_name), C(country) (2 letters), C(state), C(locality), C(organization),
+        C(organizational_unit) and C(email_address). Optional are C(subject_alt_names),
+        C(private_key_size), C(private_key_type) (C(RSA) or C(EC)), C(private_key_curve) and
+        C(private_key_passphrase).
+    type: list
+    elements: dict
+  base_output_directory:
+    description: Directory that gets one sub directory per common name.
+    type: path
+    required: true
+  default_private_key_size:
+    description: RSA key size for definitions without C(private_key_size).
+    type: int
+    default: 2048
+  default_private_key_type:
+    description: Key type for definitions without C(private_key_type).
+    type: str
+    default: RSA
+  default_private_key_curve:
+    description: Curve of EC keys for definitions without C(private_key_curve).
+    type: str
+    default: secp256r1
+  workers:
+    description: Number of worker processes, defaults to the number of CPU cores.
+    type: int
+  force:
+    description: Regenerate all keys and CSRs, even if they match their definition.
+    type: bool
+    default: false
+requirements:
+  - cryptography >= 3.1
+'''
+
+EXAMPLES = r'''
+- name: Schlüssel und CSRs für alle Einträge aus hostnames.json generieren
+  bulk_csr:
+    src: data/hostnames.json
+    base_output_directory: /pfad/zum/zertifikat
+  register: csr_result
+'''
+
+RETURN = r'''
+results:
+  description: One entry per definition, in input order.
+  returned: always
+  type: list
+  elements: dict
+  sample:
+    - common_name: webserver1.example.com
+      key: created
+      csr: created
+      changed: true
+      key_path: /pfad/zum/zertifikat/webserver1.example.com/webserver1.example.com.key
+      csr_path: /pfad/zum/zertifikat/webserver1.example.com/webserver1.example.com.csr
+summary:
+  description: Number of keys and CSRs per state (created, regenerated, unchanged) and of failed entries.
+  returned: always
+  type: dict
+  sample: {keys: {created: 998, unchanged: 2}, csrs: {created: 998, unchanged: 2}, failed: 0}
+'''
+
+REQUIRED_FIELDS = ('common_name', 'country', 'state', 'locality', 'organization',
+                   'organizational_unit', 'email_address')
+# Definition field -> subject attribute, in the order the subject is written
+SUBJECT_FIELDS = (
+    ('country', 'COUNTRY_NAME'),
+    ('state', 'STATE_OR_PROVINCE_NAME'),
+    ('locality', 'LOCALITY_NAME'),
+    ('organization', 'ORGANIZATION_NAME'),
+    ('organizational_unit', 'ORGANIZATIONAL_UNIT_NAME'),
+    ('common_name', 'COMMON_NAME'),
+    ('email_address', 'EMAIL_ADDRESS'),
+)
+KEY_TYPES = {'RSA': 'RSA', 'EC': 'EC', 'ECC': 'EC'}
+CURVES = ('secp256r1', 'secp384r1', 'secp521r1')
+SAN_PREFIXES = ('DNS', 'IP', 'EMAIL', 'URI')
+
+
+def load_definitions(src):
+    """Read the definitions from a JSON or CSV file."""
+    with open(src, encoding='utf-8') as source:
+        if src.lower().endswith('.csv'):
+            return list(csv.DictReader(source))
+        return json.load(source)
+
+
+def normalize_definitions(definitions, params):
+    """
+    Validate all definitions and convert them to the entries the workers process.
+    Returns the entries and the list of all validation errors.
+    """
+    entries = []
+    errors = []
+    seen = set()
+    for index, definition in enumerate(definitions or []):
+        label = f"Eintrag {index + 1} ({definition.get('common_name') or '?'})" \
+            if isinstance(definition, dict) else f"Eintrag {index + 1}"
+        if not isinstance(definition, dict):
+            errors.append(f"{label}: keine Zuordnung von Feldern")
+            continue
+        problems = [f"{field} fehlt" for field in REQUIRED_FIELDS if not str(definition.get(field) or '').strip()]
+        country = str(definition.get('country') or '')
+        if country and len(country) != 2:
+            problems.append(f"country muss 2 Zeichen haben, nicht '{country}'")
+
+        common_name = str(definition.get('common_name') or '').strip()
+        if common_name in seen:
+            problems.append("common_name ist doppelt")
+        if '/' in common_name or common_name.startswith('.'):
+            problems.append("common_name ist als Verzeichnisname ungültig")
+        seen.add(common_name)
+
+        key_type = KEY_TYPES.get(str(definition.get('private_key_type') or params['default_private_key_type']).upper())
+        if key_type is None:
+            problems.append(f"private_key_type '{definition.get('private_key_type')}' wird nicht unterstützt (RSA, EC)")
+        try:
+            key_size = int(definition.get('private_key_size') or params['default_private_key_size'])
+        except ValueError:
+            problems.append(f"private_key_size '{definition.get('private_key_size')}' ist keine Zahl")
+            key_size = None
+        if key_type == 'RSA' and key_size is not None and key_size < 1024:
+            problems.append(f"private_key_size {key_size} ist zu klein")
+        curve = str(definition.get('private_key_curve') or params['default_private_key_curve'])
+        if key_type == 'EC' and curve not in CURVES:
+            problems.append(f"private_key_curve '{curve}' wird nicht unterstützt ({', '.join(CURVES)})")
+
+        sans = definition.get('subject_alt_names') or []
+        if isinstance(sans, str):
+            sans = [san.strip() for san in sans.split(',') if san.strip()]
+        for san in sans:
+            prefix, _, value = san.partition(':')
+            if prefix.upper() not in SAN_PREFIXES or not value:
+                problems.append(f"subject_alt_name '{san}' ungültig (DNS:, IP:, email:, URI:)")
+            elif prefix.upper() == 'IP':
+                try:
+                    ipaddress.ip_address(value)
+                except ValueError:
+                    problems.append(f"subject_alt_name '{san}' ist keine IP-Adresse")
+
+        if problems:
+            errors.append(f"{label}: {', '.join(problems)}")
+            continue
+        directory = os.path.join(params['base_output_directory'], common_name)
+        entries.append({
+            'common_name': common_name,
+            'subject': [(attribute, str(definition[field]).strip()) for field, attribute in SUBJECT_FIELDS],
+            'sans': sans,
+            'key_type': key_type,
+            'key_size': key_size,
+            'curve': curve,
+            'passphrase': definition.get('private_key_passphrase') or None,
+            'directory': directory,
+            'key_path': os.path.join(directory, f"{common_name}.key"),
+            'csr_path': os.path.join(directory, f"{common_name}.csr"),
+        })
+    return entries, errors
+
+
+def _san_names(sans):
+    names = []
+    for san in sans:
+        prefix, _, value = san.partition(':')
+        prefix = prefix.upper()
+        if prefix == 'DNS':
+            names.append(x509.DNSName(value))
+        elif prefix == 'IP':
+            names.append(x509.IPAddress(ipaddress.ip_address(value)))
+        elif prefix == 'EMAIL':
+            names.append(x509.RFC822Name(value))
+        else:
+            names.append(x509.UniformResourceIdentifier(value))
+    return names
+
+
+def _key_matches(key, entry):
+    if entry['key_type'] == 'RSA':
+        return isinstance(key, rsa.RSAPrivateKey) and key.key_size == entry['key_size']
+    return isinstance(key, ec.EllipticCurvePrivateKey) and key.curve.name == entry['curve']
+
+
+def _csr_matches(csr, key, entry):
+    subject = {(attribute.oid.dotted_string, attribute.value) for attribute in csr.subject}
+    wanted = {(getattr(NameOID, attribute).dotted_string, value) for attribute, value in entry['subject']}
+    try:
+        sans = set(csr.extensions.get_extension_for_class(x509.SubjectAlternativeName).value)
+    except x509.ExtensionNotFound:
+        sans = set()
+    public_format = (serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return subject == wanted and sans == set(_san_names(entry['sans'])) and csr.is_signature_valid \
+        and csr.public_key().public_bytes(*public_format) == key.public_key().public_bytes(*public_format)
+
+
+def _write_file(path, data, mode):
+    """Write a file atomically with the given permissions."""
+    tmp_path = f"{path}.tmp"
+    descriptor = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with os.fdopen(descriptor, 'wb') as output:
+        output.write(data)
+    os.chmod(tmp_path, mode)
+    os.replace(tmp_path, path)
+
+
+def _load_existing(path, loader):
+    """Load an existing key or CSR, None if it is missing or cannot be read."""
+    try:
+        with open(path, 'rb') as existing:
+            return loader(existing.read())
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def process_entry(entry, force=False, check_mode=False):
+    """Create or check the key and CSR of one entry; runs in a worker process."""
+    result = {'common_name': entry['common_name'], 'key_path': entry['key_path'], 'csr_path': entry['csr_path']}
+    try:
+        password = entry['passphrase'].encode('utf-8') if entry['passphrase'] else None
+        key = None if force else _load_existing(
+            entry['key_path'], lambda data: serialization.load_pem_private_key(data, password=password))
+        if key is not None and _key_matches(key, entry):
+            result['key'] = 'unchanged'
+        else:
+            result['key'] = 'regenerated' if os.path.exists(entry['key_path']) else 'created'
+            if entry['key_type'] == 'RSA':
+                key = rsa.generate_private_key(public_exponent=65537, key_size=entry['key_size'])
+            else:
+                key = ec.generate_private_key(getattr(ec, entry['curve'].upper())())
+
+        csr = None if force or result['key'] != 'unchanged' else _load_existing(entry['csr_path'], x509.load_pem_x509_csr)
+        if csr is not None and _csr_matches(csr, key, entry):
+            result['csr'] = 'unchanged'
+        else:
+            result['csr'] = 'regenerated' if os.path.exists(entry['csr_path']) else 'created'
+            builder = x509.CertificateSigningRequestBuilder().subject_name(x509.Name(
+                [x509.NameAttribute(getattr(NameOID, attribute), value) for attribute, value in entry['subject']]))
+            if entry['sans']:
+                builder = builder.add_extension(x509.SubjectAlternativeName(_san_names(entry['sans'])), critical=False)
+            csr = builder.sign(key, hashes.SHA256())
+
+        result['changed'] = result['key'] != 'unchanged' or result['csr'] != 'unchanged'
+        if check_mode or not result['changed']:
+            return result
+        os.makedirs(entry['directory'], mode=0o755, exist_ok=True)
+        if result['key'] != 'unchanged':
+            encryption = serialization.BestAvailableEncryption(password) if password else serialization.NoEncryption()
+            _write_file(entry['key_path'], key.private_bytes(
+                serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, encryption), 0o600)
+        _write_file(entry['csr_path'], csr.public_bytes(serialization.Encoding.PEM), 0o644)
+    except Exception as e:  # Reported per entry, the other entries go on
+        result.update(failed=True, changed=False, msg=f"{type(e).__name__}: {e}")
+    return result
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            src=dict(type='path'),
+            definitions=dict(type='list', elements='dict'),
+            base_output_directory=dict(type='path', required=True),
+            default_private_key_size=dict(type='int', default=2048),
+            default_private_key_type=dict(type='str', default='RSA'),
+            default_private_key_curve=dict(type='str', default='secp256r1'),
+            workers=dict(type='int'),
+            force=dict(type='bool', default=False),
+        ),
+        required_one_of=[('src', 'definitions')],
+        mutually_exclusive=[('src', 'definitions')],
+        supports_check_mode=True,
+    )
+    if not HAS_CRYPTOGRAPHY:
+        module.fail_json(msg=missing_required_lib('cryptography'), exception=CRYPTOGRAPHY_IMPORT_ERROR)
+
+    params = module.params
+    if params['src']:
+        try:
+            definitions = load_definitions(params['src'])
+        except (OSError, ValueError) as e:
+            module.fail_json(msg=f"Datenquelle {params['src']} konnte nicht gelesen werden: {e}")
+    else:
+        definitions = params['definitions']
+    if not isinstance(definitions, list):
+        module.fail_json(msg="Die Datenquelle muss eine Liste von CSR-Definitionen enthalten")
+
+    entries, errors = normalize_definitions(definitions, params)
+    if errors:
+        module.fail_json(msg=f"{len(errors)} ungültige CSR-Definitionen", errors=errors)
+
+    workers = max(min(params['workers'] or os.cpu_count() or 1, len(entries)), 1)
+    # fork: the module runs from an AnsiballZ payload that other start methods cannot re-import
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as executor:
+        results = list(executor.map(process_entry, entries, [params['force']] * len(entries),
+                                    [module.check_mode] * len(entries)))
+
+    summary = {'keys': {}, 'csrs': {}, 'failed': 0}
+    for result in results:
+        if result.get('failed'):
+            summary['failed'] += 1
+            continue
+        summary['keys'][result['key']] = summary['keys'].get(result['key'], 0) + 1
+        summary['csrs'][result['csr']] = summary['csrs'].get(result['csr'], 0) + 1
+    changed = any(result['changed'] for result in results)
+    if summary['failed']:
+        module.fail_json(msg=f"{summary['failed']} von {len(results)} Einträgen fehlgeschlagen",
+                         changed=changed, results=results, summary=summary)
+    module.exit_json(changed=changed, results=results, summary=summary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Ansible lookup cert_index: scans the certificate input folder once and maps hostnames to their files.
+
+Replaces the find on the input folder that ssl_certificate_exchange.yml ran for every host, followed
+by a regex and a delegated stat per certificate and host (hosts x certificates iterations).
+"""
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+
+from ansible.errors import AnsibleLookupError
+from ansible.plugins.lookup import LookupBase
+from ansible.utils.display import Display
+
+DOCUMENTATION = r'''
+---
+name: cert_index
+short_description: Index of the signed certificates waiting in the input folder, by hostname
+description:
+  - Lists the C(*.crt) files of the input folder once and returns a dictionary
+    C(hostname => certificate entry). The hostname is the part of the file name after the last
+    underscore, e.g. C(webserver1.example.com) for C(zertifikat_webserver1.example.com.crt).
+  - The private key is expected in C(<folder>/<hostname>/<hostname>.key), the PFX file for IIS in
+    C(<folder>/<hostname>/<hostname>.pfx).
+  - The SHA-256 fingerprint and the SHA-1 thumbprint of each certificate are cached in I(cache_file)
+    together with the size and modification time of the file, so unchanged certificates are not read
+    again on the next run.
+  - If several certificates belong to the same hostname, the newest one is used and a warning is shown.
+    The older ones are listed in C(superseded), so the playbook can move them out of the input folder.
+options:
+  _terms:
+    description: Input folder with the signed certificates.
+    required: true
+  cache_file:
+    description:
+      - File name of the fingerprint cache inside the input folder. An empty string disables the cache.
+    type: str
+    default: .cert_index.json
+'''
+
+EXAMPLES = r'''
+- name: Zertifikate im Eingangsordner einmal indizieren
+  set_fact:
+    cert_index: "{{ lookup('cert_index', cert_input_path) }}"
+  run_once: true
+  delegate_to: localhost
+
+- name: Zertifikat des Hosts bestimmen
+  set_fact:
+    cert: "{{ cert_index[inventory_hostname] | default(None) }}"
+'''
+
+RETURN = r'''
+_raw:
+  description: Dictionary hostname => certificate entry.
+  type: dict
+  contains:
+    hostname:
+      description: Hostname taken from the file name.
+      type: str
+    cert_path:
+      description: Path of the certificate.
+      type: str
+    cert_file:
+      description: File name of the certificate, used as file name on the target.
+      type: str
+    key_path:
+      description: Expected path of the private key.
+      type: str
+    key_exists:
+      description: Whether the private key exists.
+      type: bool
+    pfx_path:
+      description: Path of the PFX file generated for IIS.
+      type: str
+    fingerprint:
+      description: SHA-256 fingerprint, upper case and colon separated like C(openssl x509 -fingerprint -sha256).
+      type: str
+    thumbprint:
+      description: SHA-1 thumbprint, upper case without separators like in the Windows certificate store.
+      type: str
+    superseded:
+      description: Paths of older certificates for the same hostname, replaced by this one.
+      type: list
+      elements: str
+'''
+
+display = Display()
+
+HOSTNAME_RE = re.compile(r'.*_([^_]+)\.crt$')
+PEM_RE = re.compile(rb'-----BEGIN CERTIFICATE-----(.+?)-----END CERTIFICATE-----', re.DOTALL)
+
+
+def certificate_digests(path):
+    """Return the SHA-256 fingerprint and SHA-1 thumbprint of the first certificate in a PEM or DER file."""
+    with open(path, 'rb') as cert_file:
+        data = cert_file.read()
+    match = PEM_RE.search(data)
+    if match:
+        try:
+            data = base64.b64decode(b''.join(match.group(1).split()), validate=True)
+        except binascii.Error as error:
+            raise ValueError(f"Ungültiges PEM-Zertifikat {path}: {error}") from error
+    fingerprint = hashlib.sha256(data).hexdigest().upper()
+    return {
+        'fingerprint': ':'.join(fingerprint[i:i + 2] for i in range(0, len(fingerprint), 2)),
+        'thumbprint': hashlib.sha1(data).hexdigest().upper(),
+    }
+
+
+def load_cache(path):
+    """Read the fingerprint cache, an unreadable cache is treated as empty."""
+    try:
+        with open(path, 'r', encoding='utf-8') as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_cache(path, cache):
+    """Write the fingerprint cache atomically."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(cache, cache_file, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+    except OSError as error:
+        display.warning(f"Fingerprint-Cache {path} konnte nicht geschrieben werden: {error}")
+
+
+def build_index(folder, cache_file=None):
+    """Scan the folder once and return (index, cache_hits, cache_misses)."""
+    cache_path = os.path.join(folder, cache_file) if cache_file else None
+    cache = load_cache(cache_path) if cache_path else {}
+    new_cache = {}
+    index = {}
+    mtimes = {}
+    hits = misses = 0
+
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            match = HOSTNAME_RE.match(entry.name)
+            if not match or not entry.is_file():
+                continue
+            hostname = match.group(1)
+            stat = entry.stat()
+            cached = cache.get(entry.name)
+            if cached and cached.get('size') == stat.st_size and cached.get('mtime_ns') == stat.st_mtime_ns:
+                digests = {'fingerprint': cached['fingerprint'], 'thumbprint': cached['thumbprint']}
+                hits += 1
+            else:
+                try:
+                    digests = certificate_digests(entry.path)
+                except (OSError, ValueError) as error:
+                    display.warning(str(error))
+                    continue
+                misses += 1
+            new_cache[entry.name] = dict(digests, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+            superseded = []
+            if hostname in index:
+                display.warning(f"Mehrere Zertifikate für {hostname}, verwende das neueste, die älteren "
+                                f"werden in den Erledigt-Ordner verschoben ({index[hostname]['cert_file']}, {entry.name})")
+                if mtimes[hostname] >= stat.st_mtime_ns:
+                    index[hostname]['superseded'].append(entry.path)
+                    continue
+                superseded = index[hostname]['superseded'] + [index[hostname]['cert_path']]
+            host_dir = os.path.join(folder, hostname)
+            key_path = os.path.join(host_dir, f"{hostname}.key")
+            index[hostname] = dict(
+                digests,
+                hostname=hostname,
+                cert_path=entry.path,
+                cert_file=entry.name,
+                key_path=key_path,
+                key_exists=os.path.isfile(key_path),
+                pfx_path=os.path.join(host_dir, f"{hostname}.pfx"),
+                superseded=superseded,
+            )
+            mtimes[hostname] = stat.st_mtime_ns
+
+    if cache_path and new_cache != cache:
+        save_cache(cache_path, new_cache)
+    return index, hits, misses
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        cache_file = self.get_option('cache_file')
+
+        results = []
+        for term in terms:
+            folder = os.path.expanduser(str(term))
+            if not os.path.isdir(folder):
+                raise AnsibleLookupError(f"Eingangsordner {folder} existiert nicht")
+            index, hits, misses = build_index(folder, cache_file)
+            display.vv(f"cert_index: {len(index)} Zertifikate in {folder} "
+                       f"({hits} aus dem Cache, {misses} neu gelesen)")
+            results.append(index)
+        return results
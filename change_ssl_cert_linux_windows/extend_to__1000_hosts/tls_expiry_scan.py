@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+TLS expiry scanner for the hosts of ssl_certificate_exchange.yml
+
+Connects to every host of the Ansible inventory and/or data/hostnames.json in parallel, reads the
+certificate the server presents and records expiry, SANs and issuer. Hosts whose certificate expires
+within --days, is already expired, does not cover the hostname or lacks SANs of its hostnames.json
+definition need a renewal. For them the scanner writes
+
+- a hostnames.json subset (--output) for generate_csr.yml: ansible-playbook generate_csr.yml -e csr_src=...
+- a host list (--limit-file) for the exchange playbook: ansible-playbook ... --limit @renew_hosts.txt
+- optionally a report of all hosts (--report).
+
+Requires the Python module 'cryptography' on the control host, like library/bulk_csr.py.
+The inventory is read as YAML inventory or as the JSON of 'ansible-inventory -i ... --list'.
+The host variables 'ansible_host' (address) and 'tls_port' (port) are honoured.
+
+Usage:
+    python3 tls_expiry_scan.py -i inventory.yml --hostnames data/hostnames.json --days 30 \\
+        --output data/renew.json --limit-file renew_hosts.txt --report tls_report.json
+"""
+import argparse
+import datetime
+import ipaddress
+import json
+import socket
+import ssl
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from cryptography import x509
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+    from cryptography.x509.oid import ExtensionOID, NameOID
+except ImportError:
+    sys.exit("Das Python-Modul 'cryptography' wird benötigt: pip install cryptography")
+
+SUBJECT_FIELDS = {
+    'country': NameOID.COUNTRY_NAME,
+    'state': NameOID.STATE_OR_PROVINCE_NAME,
+    'locality': NameOID.LOCALITY_NAME,
+    'organization': NameOID.ORGANIZATION_NAME,
+    'organizational_unit': NameOID.ORGANIZATIONAL_UNIT_NAME,
+    'email_address': NameOID.EMAIL_ADDRESS,
+}
+
+
+def load_inventory(path: str) -> Dict[str, Dict]:
+    """
+    Return hostname => host variables of an Ansible inventory.
+
+    Accepts a YAML inventory or the JSON written by 'ansible-inventory --list'.
+    """
+    with open(path, 'r', encoding='utf-8') as inventory_file:
+        content = inventory_file.read()
+    try:
+        data = json.loads(content)
+    except ValueError:
+        import yaml  # pylint: disable=import-outside-toplevel
+        data = yaml.safe_load(content) or {}
+
+    if '_meta' in data:
+        hosts = dict(data['_meta'].get('hostvars', {}))
+        for group in data.values():
+            if isinstance(group, dict):
+                hosts.update({host: hosts.get(host, {}) for host in group.get('hosts', [])})
+        return hosts
+
+    hosts = {}
+
+    def walk(group: Dict) -> None:
+        for host, host_vars in (group.get('hosts') or {}).items():
+            hosts.setdefault(host, {}).update(host_vars or {})
+        for child in (group.get('children') or {}).values():
+            walk(child or {})
+
+    for group in data.values():
+        walk(group or {})
+    return hosts
+
+
+def load_definitions(path: str) -> Dict[str, Dict]:
+    """Return common_name => CSR definition of a hostnames.json file."""
+    with open(path, 'r', encoding='utf-8') as definitions_file:
+        definitions = json.load(definitions_file)
+    return {definition['common_name']: definition for definition in definitions}
+
+
+def build_targets(inventory: Dict[str, Dict], definitions: Dict[str, Dict],
+                  default_port: int) -> List[Tuple[str, str, int]]:
+    """Return (hostname, address, port) for every host of the inventory and the definitions."""
+    targets = []
+    for hostname in sorted(set(inventory) | set(definitions)):
+        host_vars = inventory.get(hostname, {})
+        address = host_vars.get('ansible_host', hostname)
+        port = int(host_vars.get('tls_port', default_port))
+        targets.append((hostname, address, port))
+    return targets
+
+
+def fetch_certificate(address: str, port: int, server_name: str, timeout: float) -> bytes:
+    """Do a TLS handshake and return the DER encoded certificate of the server."""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    try:
+        ipaddress.ip_address(server_name)
+        server_name = None  # No SNI for IP addresses
+    except ValueError:
+        pass
+    with socket.create_connection((address, port), timeout=timeout) as sock:
+        sock.settimeout(timeout)
+        with context.wrap_socket(sock, server_hostname=server_name) as tls_sock:
+            der = tls_sock.getpeercert(binary_form=True)
+    if not der:
+        raise ssl.SSLError("Server hat kein Zertifikat gesendet")
+    return der
+
+
+def certificate_sans(certificate) -> List[str]:
+    """Return the SANs of a certificate in the notation of hostnames.json (DNS:..., IP:...)."""
+    try:
+        extension = certificate.extensions.get_extension_for_oid(ExtensionOID.SUBJECT_ALTERNATIVE_NAME)
+    except x509.ExtensionNotFound:
+        return []
+    names = [f'DNS:{name}' for name in extension.value.get_values_for_type(x509.DNSName)]
+    names += [f'IP:{address}' for address in extension.value.get_values_for_type(x509.IPAddress)]
+    return names
+
+
+def name_matches(hostname: str, names: Iterable[str]) -> bool:
+    """Check if a hostname is covered by one of the DNS names, including '*.' wildcards."""
+    hostname = hostname.lower().rstrip('.')
+    for name in names:
+        name = name.lower().rstrip('.')
+        if name == hostname:
+            return True
+        if name.startswith('*.') and '.' in hostname and hostname.split('.', 1)[1] == name[2:]:
+            return True
+    return False
+
+
+def common_name(name) -> Optional[str]:
+    attributes = name.get_attributes_for_oid(NameOID.COMMON_NAME)
+    return attributes[0].value if attributes else None
+
+
+def inspect_certificate(hostname: str, der: bytes, definition: Optional[Dict], days: int,
+                        now: datetime.datetime) -> Dict:
+    """Evaluate a certificate and return its details and the reasons for a renewal."""
+    certificate = x509.load_der_x509_certificate(der)
+    not_after = getattr(certificate, 'not_valid_after_utc', None)  # cryptography >= 42
+    if not_after is None:
+        not_after = certificate.not_valid_after.replace(tzinfo=datetime.timezone.utc)
+    days_left = (not_after - now).total_seconds() / 86400
+    sans = certificate_sans(certificate)
+    subject_cn = common_name(certificate.subject)
+
+    reasons = []
+    if days_left < 0:
+        reasons.append('abgelaufen')
+    elif days_left < days:
+        reasons.append(f'läuft in {round(days_left)} Tagen ab')
+    dns_names = [san[4:] for san in sans if san.startswith('DNS:')] or [subject_cn or '']
+    ip_names = [san[3:] for san in sans if san.startswith('IP:')]
+    if not name_matches(hostname, dns_names) and hostname not in ip_names:
+        reasons.append('Hostname nicht im Zertifikat')
+    if definition:
+        wanted = definition.get('subject_alt_names') or []
+        if isinstance(wanted, str):
+            wanted = [san.strip() for san in wanted.split(',') if san.strip()]
+        missing = [san for san in wanted if san not in sans]
+        if missing:
+            reasons.append(f"SANs fehlen: {', '.join(missing)}")
+
+    return {
+        'not_after': not_after.isoformat(),
+        'days_left': round(days_left, 1),
+        'subject': certificate.subject.rfc4514_string(),
+        'issuer': certificate.issuer.rfc4514_string(),
+        'sans': sans,
+        'self_signed': certificate.issuer == certificate.subject,
+        'reasons': reasons,
+        '_certificate': certificate,
+    }
+
+
+def definition_from_certificate(hostname: str, certificate) -> Dict:
+    """Build a hostnames.json entry for a host without definition from its current certificate."""
+    definition = {'common_name': hostname}
+    for field, oid in SUBJECT_FIELDS.items():
+        attributes = certificate.subject.get_attributes_for_oid(oid)
+        if attributes:
+            definition[field] = attributes[0].value
+    try:
+        own_name = f'IP:{ipaddress.ip_address(hostname)}'
+    except ValueError:
+        own_name = f'DNS:{hostname}'
+    sans = certificate_sans(certificate)
+    definition['subject_alt_names'] = sans if own_name in sans else [own_name] + sans
+    public_key = certificate.public_key()
+    if isinstance(public_key, rsa.RSAPublicKey):
+        definition.update(private_key_type='RSA', private_key_size=public_key.key_size)
+    elif isinstance(public_key, ec.EllipticCurvePublicKey):
+        definition.update(private_key_type='EC', private_key_curve=public_key.curve.name)
+    return definition
+
+
+def scan_host(target: Tuple[str, str, int], definition: Optional[Dict], days: int, timeout: float,
+              now: datetime.datetime) -> Dict:
+    """Scan one host, errors are recorded in the result instead of raised."""
+    hostname, address, port = target
+    result = {'host': hostname, 'address': address, 'port': port}
+    start = time.perf_counter()
+    try:
+        der = fetch_certificate(address, port, hostname, timeout)
+        result.update(inspect_certificate(hostname, der, definition, days, now))
+        result['status'] = 'renew' if result['reasons'] else 'ok'
+    except (OSError, ValueError) as error:
+        result.update(status='error', error=f'{type(error).__name__}: {error}')
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def scan(targets: List[Tuple[str, str, int]], definitions: Dict[str, Dict], days: int, timeout: float,
+         workers: int) -> List[Dict]:
+    """Scan all targets with at most 'workers' handshakes at the same time."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            lambda target: scan_host(target, definitions.get(target[0]), days, timeout, now), targets))
+
+
+def renewal_definitions(results: List[Dict], definitions: Dict[str, Dict]) -> List[Dict]:
+    """Return the hostnames.json entries of all hosts that need a renewal."""
+    subset = []
+    for result in results:
+        if result['status'] != 'renew':
+            continue
+        definition = definitions.get(result['host'])
+        if definition is None:
+            definition = definition_from_certificate(result['host'], result['_certificate'])
+            missing = [field for field in SUBJECT_FIELDS if field not in definition]
+            if missing:
+                print(f"Warnung: {result['host']} fehlt in hostnames.json und das Zertifikat enthält "
+                      f"{', '.join(missing)} nicht, bitte in der Ausgabe ergänzen", file=sys.stderr)
+        subset.append(definition)
+    return subset
+
+
+def write_json(path: str, data) -> None:
+    with open(path, 'w', encoding='utf-8') as output_file:
+        json.dump(data, output_file, indent=2, ensure_ascii=False)
+        output_file.write('\n')
+
+
+def print_summary(results: List[Dict], seconds: float) -> None:
+    for result in results:
+        if result['status'] == 'renew':
+            print(f"ERNEUERN {result['host']}:{result['port']}  {result['not_after']}  "
+                  f"{'; '.join(result['reasons'])}")
+        elif result['status'] == 'error':
+            print(f"FEHLER   {result['host']}:{result['port']}  {result['error']}")
+    counts = {status: sum(1 for result in results if result['status'] == status)
+              for status in ('ok', 'renew', 'error')}
+    print(f"{len(results)} Hosts in {seconds:.1f}s gescannt: {counts['ok']} ok, "
+          f"{counts['renew']} zu erneuern, {counts['error']} nicht erreichbar/fehlerhaft")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scan the TLS certificates of all hosts and list the ones to renew')
+    parser.add_argument('-i', '--inventory', help="YAML inventory or JSON of 'ansible-inventory --list'")
+    parser.add_argument('--hostnames', help='hostnames.json with the CSR definitions')
+    parser.add_argument('--port', type=int, default=443, help="TLS port for hosts without 'tls_port'")
+    parser.add_argument('--days', type=int, default=30, help='Renew certificates expiring within DAYS')
+    parser.add_argument('--timeout', type=float, default=5.0, help='Seconds per connect/handshake step')
+    parser.add_argument('--workers', type=int, default=50, help='Maximum number of parallel handshakes')
+    parser.add_argument('--output', help='Write the hostnames.json entries of the hosts to renew to FILE')
+    parser.add_argument('--limit-file', help='Write the hosts to renew to FILE, for --limit @FILE')
+    parser.add_argument('--report', help='Write the results of all hosts as JSON to FILE')
+    args = parser.parse_args()
+    if not args.inventory and not args.hostnames:
+        parser.error('--inventory und/oder --hostnames angeben')
+
+    inventory = load_inventory(args.inventory) if args.inventory else {}
+    definitions = load_definitions(args.hostnames) if args.hostnames else {}
+    if inventory and definitions:
+        # Only hosts of the inventory can be exchanged by the playbook
+        definitions = {host: definition for host, definition in definitions.items() if host in inventory}
+    targets = build_targets(inventory, definitions, args.port)
+
+    start = time.perf_counter()
+    results = scan(targets, definitions, args.days, args.timeout, max(1, args.workers))
+    print_summary(results, time.perf_counter() - start)
+
+    renew = [result['host'] for result in results if result['status'] == 'renew']
+    if args.output:
+        write_json(args.output, renewal_definitions(results, definitions))
+    if args.limit_file:
+        with open(args.limit_file, 'w', encoding='utf-8') as limit_file:
+            limit_file.writelines(f'{host}\n' for host in renew)
+    if args.report:
+        write_json(args.report, [{key: value for key, value in result.items() if not key.startswith('_')}
+                                 for result in results])
+
+
+if __name__ == '__main__':
+    main()
@@ -4,22 +4,433 @@ ExtremeCloudIQ Syncer Plugin for CMDBSyncer
 
 This plugin integrates with the ExtremeCloudIQ API to synchronize device data into the CMDBSyncer inventory.
 It supports authentication via username/password to obtain a 24-hour valid Bearer token and fetches devices
-with pagination. Interface synchronization is included as a commented placeholder, pending a specific API endpoint.
+with pagination. Interfaces are synchronized per device via /devices/{id}/interfaces or a configurable bulk endpoint.
 """
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 import datetime
-from typing import Dict, List, Optional
+import hashlib
+import os
+import re
+import glob
+import gzip
+import bisect
+import threading
+import asyncio
+import multiprocessing
+from contextlib import nullcontext
+from collections import Counter, deque
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+from mongoengine.connection import ConnectionFailure
+try:
+    import ijson  # Optional, enables incremental parsing of device pages
+except ImportError:
+    ijson = None
 from application import app, logger
 from application.models.host import Host
 from application.modules.debug import ColorCodes
 from .base import BaseAccount, BaseObject, BasePlugin
 
+class ExtremeCloudRateLimiter:
+    """
+    Thread-safe token bucket shared by all requests of one account.
+
+    The refill rate starts at the configured value and is adapted to the quota the API
+    reports in its RateLimit-* headers, so requests are spread evenly over the remaining
+    window. The headers describe the quota of the whole account, so a limiter that only
+    gets a part of it (share, e.g. 1/4 in each of four processes) applies that part to the
+    reported rate. A 429 with Retry-After blocks all callers until the given time has passed.
+    """
+    _MIN_RATE = 0.05  # Never slow down below one request every 20 seconds
+
+    def __init__(self, rate: float, burst: int, share: float = 1.0):
+        self.rate = max(rate, self._MIN_RATE)
+        self.burst = max(burst, 1)
+        self.share = min(share, 1.0) if share > 0 else 1.0
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._wait_time = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def wait_time(self) -> float:
+        """Total seconds callers spent waiting on the limiter since the last reset (summed over threads)."""
+        return self._wait_time
+
+    def reset_stats(self) -> None:
+        """Reset the wait time counter, e.g. at the start of a sync."""
+        with self._lock:
+            self._wait_time = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent.
+
+        Returns:
+            float: The number of seconds the caller waited.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    self._wait_time += waited
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def block_for(self, seconds: float) -> None:
+        """Stop all callers for the given number of seconds (e.g. after a 429)."""
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._tokens = 0.0
+            self._last_refill = now
+
+    def update_from_headers(self, headers) -> None:
+        """Adapt the refill rate to the quota reported in the response headers."""
+        remaining = self._header_number(headers, 'RateLimit-Remaining', 'X-RateLimit-Remaining')
+        reset = self._header_number(headers, 'RateLimit-Reset', 'X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        if reset > 1e9:  # Some APIs send the reset as epoch timestamp instead of seconds
+            reset = max(reset - time.time(), 0)
+        if remaining <= 0:
+            self.block_for(reset)
+            return
+        with self._lock:
+            self.rate = max(remaining / max(reset, 1) * self.share, self._MIN_RATE)
+
+    @staticmethod
+    def _header_number(headers, *names: str) -> Optional[float]:
+        """Return the first numeric value of the first header present, e.g. '7500, w=3600' -> 7500."""
+        for name in names:
+            value = headers.get(name)
+            if value is None:
+                continue
+            try:
+                return float(str(value).split(',')[0].split(';')[0].strip())
+            except ValueError:
+                return None
+        return None
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given either in seconds or as HTTP date."""
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(retry_at.timestamp() - time.time(), 0.0)
+
+class ExtremeCloudSyncMetrics:
+    """
+    Counters, phase timings and the page latency histogram of one sync run.
+
+    Collected from all threads of the run with a single lock per update, returned
+    from the run and optionally written in Prometheus text format.
+    """
+    PAGE_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    _PROMETHEUS_PREFIX = 'extremecloud_sync'
+
+    def __init__(self):
+        self.counters = Counter()
+        self.timings = Counter()  # Seconds per phase
+        self.page_latency_counts = [0] * (len(self.PAGE_LATENCY_BUCKETS) + 1)
+        self.page_latency_sum = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: int = 1) -> None:
+        """Increase a counter."""
+        with self._lock:
+            self.counters[name] += value
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Add seconds to a phase timing."""
+        with self._lock:
+            self.timings[name] += seconds
+
+    def merge(self, other: 'ExtremeCloudSyncMetrics') -> None:
+        """Add the counters, timings and page latencies of another run, e.g. of a worker process."""
+        with self._lock:
+            self.counters.update(other.counters)
+            self.timings.update(other.timings)
+            self.page_latency_counts = [a + b for a, b in zip(self.page_latency_counts, other.page_latency_counts)]
+            self.page_latency_sum += other.page_latency_sum
+
+    def __getstate__(self) -> Dict:
+        state = dict(self.__dict__)
+        del state['_lock']  # Locks cannot be pickled, needed to return metrics from worker processes
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def observe_page_latency(self, seconds: float) -> None:
+        """Record the latency of one page request in the histogram."""
+        index = bisect.bisect_left(self.PAGE_LATENCY_BUCKETS, seconds)
+        with self._lock:
+            self.page_latency_counts[index] += 1
+            self.page_latency_sum += seconds
+
+    def as_dict(self) -> Dict:
+        """Return all metrics as plain dict."""
+        with self._lock:
+            buckets = dict(zip([str(bound) for bound in self.PAGE_LATENCY_BUCKETS] + ['+Inf'],
+                               self.page_latency_counts))
+            return {
+                'counters': dict(self.counters),
+                'timings': {name: round(seconds, 3) for name, seconds in self.timings.items()},
+                'page_latency': {'buckets': buckets, 'sum': round(self.page_latency_sum, 3),
+                                 'count': sum(self.page_latency_counts)},
+            }
+
+    def to_prometheus(self, account_name: str) -> str:
+        """Render the metrics in Prometheus text exposition format."""
+        escaped = account_name.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        label = f'account="{escaped}"'
+        prefix = self._PROMETHEUS_PREFIX
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'# TYPE {prefix}_{name}_total counter')
+                lines.append(f'{prefix}_{name}_total{{{label}}} {value}')
+            for name, seconds in sorted(self.timings.items()):
+                lines.append(f'# TYPE {prefix}_{name}_seconds gauge')
+                lines.append(f'{prefix}_{name}_seconds{{{label}}} {seconds:.6f}')
+            lines.append(f'# TYPE {prefix}_page_latency_seconds histogram')
+            cumulative = 0
+            for bound, count in zip(self.PAGE_LATENCY_BUCKETS + ('+Inf',), self.page_latency_counts):
+                cumulative += count
+                lines.append(f'{prefix}_page_latency_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_page_latency_seconds_sum{{{label}}} {self.page_latency_sum:.6f}')
+            lines.append(f'{prefix}_page_latency_seconds_count{{{label}}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str, account_name: str) -> None:
+        """Write the metrics to a file atomically, e.g. for the node_exporter textfile collector."""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as metrics_file:
+            metrics_file.write(self.to_prometheus(account_name))
+        os.replace(tmp_path, path)
+
+class ExtremeCloudSyncProgress:
+    """
+    Aggregated progress of one phase of a sync run (fetching or syncing devices).
+
+    Used in high volume logging mode instead of a log line per page and device: counts
+    are added from any thread, and at most one progress line with the rate, ETA and errors
+    so far is logged per interval.
+    """
+    def __init__(self, label: str, interval: float = 10.0, total: Optional[int] = None):
+        self.label = label
+        self.interval = interval
+        self.total = total
+        self.count = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self._last_log = self.started
+        self._lock = threading.Lock()
+
+    def set_total(self, total: Optional[int]) -> None:
+        """Set the expected number of devices, once the API reported it."""
+        if total:
+            self.total = total
+
+    def add(self, count: int = 0, errors: int = 0) -> None:
+        """Add processed devices and errors, and log a progress line if the interval has passed."""
+        with self._lock:
+            self.count += count
+            self.errors += errors
+            now = time.monotonic()
+            if now - self._last_log < self.interval:
+                return
+            self._last_log = now
+            done, total, errors = self.count, self.total, self.errors
+        elapsed = now - self.started
+        rate = done / elapsed if elapsed else 0.0
+        eta = '?'
+        if total and rate:
+            eta = str(datetime.timedelta(seconds=int(max(total - done, 0) / rate)))
+        logger.info("ExtremeCloudIQ %s %d/%s devices, %.1f devices/s, ETA %s, %d errors",
+                    self.label, done, total or '?', rate, eta, errors)
+
+    def as_dict(self) -> Dict:
+        """Return the totals of the phase."""
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                'devices': self.count,
+                'errors': self.errors,
+                'seconds': round(elapsed, 3),
+                'devices_per_second': round(self.count / elapsed, 1) if elapsed else None,
+            }
+
+    def log_summary(self) -> None:
+        """Log the totals of the phase."""
+        summary = self.as_dict()
+        logger.info("ExtremeCloudIQ %s %d devices in %.1fs (%s devices/s), %d errors", self.label,
+                    summary['devices'], summary['seconds'], summary['devices_per_second'], summary['errors'])
+
+class ExtremeCloudSyncState:
+    """
+    Persistent sync state of one account (checkpoints, tuning values), stored as one document
+    per account in a MongoDB collection next to the hosts, so it is shared by all syncer processes.
+    """
+    _COLLECTION = 'extremecloud_sync_state'
+
+    def __init__(self, account_id: str):
+        self.account_id = account_id
+
+    @classmethod
+    def _collection(cls):
+        return Host._get_collection().database[cls._COLLECTION]
+
+    def get(self, key: str, default=None):
+        """Return a single state value."""
+        return self.get_many(key).get(key, default)
+
+    def get_many(self, *keys: str) -> Dict:
+        """Return the given state values as dict (missing values are left out)."""
+        document = self._collection().find_one({'_id': self.account_id}, {key: 1 for key in keys}) or {}
+        document.pop('_id', None)
+        return document
+
+    def set(self, **values) -> None:
+        """Store one or more state values."""
+        self._collection().update_one({'_id': self.account_id}, {'$set': values}, upsert=True)
+
+    def unset(self, *keys: str, **if_equal) -> None:
+        """Remove state values, optionally only if the given fields still have the given values."""
+        if keys:
+            self._collection().update_one({'_id': self.account_id, **if_equal},
+                                          {'$unset': {key: '' for key in keys}})
+
+    def acquire_lease(self, key: str, seconds: float) -> Optional[float]:
+        """
+        Try to take a lease stored under key that no other process holds.
+        The lease expires after the given seconds, so a crashed holder cannot block others forever.
+
+        Returns:
+            Optional[float]: The expiry time identifying the lease, or None if it is held by another process.
+        """
+        now = time.time()
+        lease = now + seconds
+        try:
+            self._collection().update_one(
+                {'_id': self.account_id, '$or': [{key: {'$exists': False}}, {key: {'$lt': now}}]},
+                {'$set': {key: lease}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # The document exists but the lease is held, so the upsert tried to insert a duplicate
+            return None
+        return lease
+
+    def release_lease(self, key: str, lease: float) -> None:
+        """
+        Release a lease taken with acquire_lease. Nothing is done if it has expired and another
+        process holds the key by now.
+        """
+        self.unset(key, **{key: lease})
+
+class ExtremeCloudPageRecorder:
+    """
+    Records the raw /devices pages of a full sync as gzip compressed NDJSON (one page per line,
+    with the time it was fetched), so the sync can be replayed offline with the account option
+    'replay_file'. The recording only gets its final name when the sync completed.
+    """
+    SUFFIX = '.ndjson.gz'
+
+    def __init__(self, directory: str, account_name: str):
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%dT%H%M%S')
+        self.path = os.path.join(directory, f"{self.file_prefix(account_name)}{stamp}{self.SUFFIX}")
+        self._tmp_path = f'{self.path}.tmp'
+        self._file = gzip.open(self._tmp_path, 'wt', encoding='utf-8')
+        self._lock = threading.Lock()
+        self.pages = 0
+
+    @staticmethod
+    def file_prefix(account_name: str) -> str:
+        """Return the file name prefix of the recordings of an account."""
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', account_name) + '-'
+
+    def write(self, page: int, data: Dict) -> None:
+        """Append one decoded /devices page."""
+        line = json.dumps({**data, 'page': page, 'recorded': time.time()}, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self.pages += 1
+
+    def close(self, keep: bool) -> None:
+        """Close the recording and publish it under its final name, or delete it."""
+        self._file.close()
+        if keep:
+            os.replace(self._tmp_path, self.path)
+        else:
+            os.remove(self._tmp_path)
+
+    @classmethod
+    def find_recording(cls, path: str, account_name: str) -> Optional[str]:
+        """Return path itself if it is a file, otherwise the newest recording of the account in that directory."""
+        if not os.path.isdir(path):
+            return path if os.path.isfile(path) else None
+        pattern = os.path.join(glob.escape(path), f"{glob.escape(cls.file_prefix(account_name))}*{cls.SUFFIX}")
+        recordings = sorted(glob.glob(pattern))
+        return recordings[-1] if recordings else None
+
+    @staticmethod
+    def read_pages(path: str) -> Iterator[Dict]:
+        """Yield the recorded pages of a recording file one by one."""
+        with gzip.open(path, 'rt', encoding='utf-8') as recording:
+            for line in recording:
+                if line.strip():
+                    yield json.loads(line)
+
+class ExtremeCloudCountingReader:
+    """
+    File-like wrapper that counts the bytes read from a stream, e.g. the decoded body of a
+    streamed response, whose size Content-Length does not tell (chunked or compressed).
+    """
+    def __init__(self, stream):
+        self._stream = stream
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
 class ExtremeCloudAccount(BaseAccount):
     """
     Account class for ExtremeCloudIQ API configuration and authentication
     """
+    _LOGIN_LEASE_SECONDS = 30  # Max time other processes wait for a running login
     def __init__(self, account: dict):
         super().__init__(account)
         self.api_url = account.get('api_url', 'https://api.extremecloudiq.com')
@@ -28,11 +439,113 @@ class ExtremeCloudAccount(BaseAccount):
         self.verify_ssl = not app.config.get('DISABLE_SSL_ERRORS', False)
         self._auth_token = None
         self._token_expiry = 0  # Timestamp when token expires
+        self._token_lock = threading.Lock()
+        self.shared_token_cache = self.get_bool_option('shared_token_cache', True)
+        self.field_projection = self.get_bool_option('field_projection', False)
+        # Incremental parsing saves memory on very large pages, but ijson is slower than json.loads
+        self.stream_json = self.get_bool_option('stream_json', False) and ijson is not None
+        self.request_slots = None  # Optional semaphore shared with other accounts to cap global requests
+        self.recorder = None  # ExtremeCloudPageRecorder of a running full sync with 'record_dir' set
+        self.replay_file = account.get('replay_file')  # Recording (or directory of recordings) to sync from
+        self.metrics = ExtremeCloudSyncMetrics()
+        self._metrics_of_run = False  # Whether self.metrics belongs to a sync run, see start_run_metrics
+        # Aggregated progress lines instead of a log line per page and device, for large fleets
+        self.high_volume_logging = self.get_bool_option('high_volume_logging', False)
+        self.progress_interval = self.get_float_option('progress_interval', 10.0)
+        self.fetch_progress = None  # ExtremeCloudSyncProgress of a running fetch_objects
+        self.sync_progress = None  # ExtremeCloudSyncProgress of a running inventorize
+        self.page_concurrency = self.get_int_option('page_concurrency', 1)
+        self.page_size = None  # Page size for /devices, see ExtremeCloudAPI._page_size
+        self.state = ExtremeCloudSyncState(str(account['_id']))
+        self.rate_limiter = ExtremeCloudRateLimiter(
+            rate=self.get_float_option('rate_limit', 2.0),
+            burst=self.get_int_option('rate_limit_burst', self.page_concurrency),
+            share=self.get_float_option('rate_limit_share', 1.0)  # Part of the account quota, see run_sharded
+        )
+        self._headers = None
+        self._headers_token = None  # Token the cached headers were built with
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """
+        Create a persistent HTTP session for this account.
+        The connection pool is sized for the configured page concurrency so parallel
+        requests reuse keep-alive connections instead of opening new TLS handshakes.
+        """
+        pool_size = max(10, self.page_concurrency)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.verify = self.verify_ssl
+        session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+        return session
+
+    def start_run_metrics(self) -> ExtremeCloudSyncMetrics:
+        """
+        Replace the metrics by a fresh set for a sync run. Logins done before the first run,
+        e.g. by get_auth_token or fetch_objects, are counted in the run, so the login phase is not lost.
+        """
+        metrics = ExtremeCloudSyncMetrics()
+        if not self._metrics_of_run and self.metrics.counters['logins']:
+            metrics.inc('logins', self.metrics.counters['logins'])
+            metrics.add_time('login', self.metrics.timings['login'])
+        self.metrics = metrics
+        self._metrics_of_run = True
+        return metrics
+
+    def get_int_option(self, key: str, default: int) -> int:
+        """
+        Read an integer option from the account configuration.
+
+        Account fields are entered as strings in the CMDBSyncer UI, so the value is converted
+        here and the default is used if the field is missing or not a valid number.
+        """
+        value = self.account.get(key)
+        if value in (None, ''):
+            return default
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid value '{value}' for account option '{key}', using default {default}")
+            return default
+
+    def get_bool_option(self, key: str, default: bool) -> bool:
+        """Read a boolean option ('true', 'yes', '1', 'on') from the account configuration."""
+        value = self.account.get(key)
+        if value in (None, ''):
+            return default
+        if isinstance(value, bool):
+            return value
+        return str(value).strip().lower() in ('true', 'yes', '1', 'on')
+
+    def get_float_option(self, key: str, default: float) -> float:
+        """Read a float option from the account configuration, see get_int_option."""
+        value = self.account.get(key)
+        if value in (None, ''):
+            return default
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid value '{value}' for account option '{key}', using default {default}")
+            return default
+
+    def _has_valid_token(self) -> bool:
+        """Check if the in-memory token is valid for at least another 60 seconds."""
+        return bool(self._auth_token) and self._token_expiry > time.time() + 60
 
     def get_auth_token(self) -> str:
         """
-        Fetch authentication token from ExtremeCloudIQ API using username/password.
-        Caches the token for 24 hours with a 60-second buffer before expiry.
+        Return a valid Bearer token for API authentication.
+
+        The token is looked up in memory first, then in the shared token cache of the account
+        (account option 'shared_token_cache', enabled by default), which all syncer processes use.
+        Only one thread per process and, using a lease in the sync state, only one process at a
+        time logs in; the others wait for the new token.
 
         Returns:
             str: The Bearer token for API authentication.
@@ -40,26 +553,88 @@ class ExtremeCloudAccount(BaseAccount):
         Raises:
             Exception: If the token cannot be retrieved or the response is invalid.
         """
-        current_time = time.time()
-        if self._auth_token and self._token_expiry > current_time + 60:
+        if self._has_valid_token():
             logger.debug(f"{ColorCodes.OKGREEN}Using cached ExtremeCloud Auth Token{ColorCodes.ENDC}")
             return self._auth_token
 
+        with self._token_lock:
+            if self._has_valid_token():
+                return self._auth_token
+            if not self.shared_token_cache:
+                return self._login()
+            if self._load_shared_token():
+                return self._auth_token
+
+            deadline = time.time() + self._LOGIN_LEASE_SECONDS
+            lease = self.state.acquire_lease('login_lock_until', self._LOGIN_LEASE_SECONDS)
+            while lease is None:
+                if time.time() > deadline:
+                    break  # The lease has expired by now, the other process gave up
+                time.sleep(0.5)
+                if self._load_shared_token():
+                    logger.debug("Using ExtremeCloud Auth Token fetched by another process")
+                    return self._auth_token
+                lease = self.state.acquire_lease('login_lock_until', self._LOGIN_LEASE_SECONDS)
+            try:
+                token = self._login()
+                self.state.set(auth_token=token, auth_token_expiry=self._token_expiry)
+                return token
+            finally:
+                if lease is not None:
+                    self.state.release_lease('login_lock_until', lease)
+
+    def _load_shared_token(self) -> bool:
+        """Take over the token from the shared cache if it is still valid."""
+        document = self.state.get_many('auth_token', 'auth_token_expiry')
+        token = document.get('auth_token')
+        expiry = document.get('auth_token_expiry', 0)
+        if token and expiry > time.time() + 60:
+            self._auth_token = token
+            self._token_expiry = expiry
+            return True
+        return False
+
+    def invalidate_token(self, token: str) -> None:
+        """
+        Drop a token the API rejected.
+        Only clears the cache if it still holds that token, so a token another caller
+        has already renewed is kept.
+        """
+        with self._token_lock:
+            if self._auth_token == token:
+                self._auth_token = None
+        if self.shared_token_cache:
+            self.state.unset('auth_token', 'auth_token_expiry', auth_token=token)
+
+    def _login(self) -> str:
+        """
+        Fetch a new authentication token from ExtremeCloudIQ API using username/password.
+        The token is valid for 'expires_in' seconds as reported by the API (24 hours if missing).
+        """
+        current_time = time.time()
+        started = time.perf_counter()
         logger.info(f"{ColorCodes.OKGREEN}Requesting new ExtremeCloud Auth Token{ColorCodes.ENDC}")
         url = f"{self.api_url}{ExtremeCloudAPI._API_PATH_LOGIN}"
         headers = {'Content-Type': 'application/json'}
         payload = {"username": self.username, "password": self.password}
 
         try:
-            response = requests.post(url, headers=headers, json=payload, verify=self.verify_ssl, timeout=30)
+            self.rate_limiter.acquire()
+            with self.request_slots or nullcontext():
+                response = self.session.post(url, headers=headers, json=payload, timeout=30)
             response.raise_for_status()
             response_json = response.json()
             token = response_json.get('access_token')
             if not token:
                 raise Exception(f"Auth Token (access_token) not found in response: {response_json}")
 
-            self._auth_token =所在的
-            self._token_expiry = current_time + 24 * 3600  # Token valid for 24 hours
+            expires_in = response_json.get('expires_in')
+            if not isinstance(expires_in, (int, float)) or expires_in <= 0:
+                expires_in = 24 * 3600  # Token valid for 24 hours
+            self._auth_token = token
+            self._token_expiry = current_time + expires_in
+            self.metrics.inc('logins')
+            self.metrics.add_time('login', time.perf_counter() - started)
             return token
 
         except requests.exceptions.RequestException as e:
@@ -68,16 +643,25 @@ class ExtremeCloudAccount(BaseAccount):
             raise Exception(f"Connection Problem or Authentication Failed: {e}") from e
 
     def _make_headers(self) -> Dict[str, str]:
-        """Create headers with Bearer token for API requests."""
-        return {
-            'Authorization': f'Bearer {self.get_auth_token()}',
-            'Content-Type': 'application/json'
-        }
+        """
+        Return headers with Bearer token for API requests.
+        The headers are built once and only rebuilt when the token changes.
+        """
+        token = self.get_auth_token()
+        if self._headers is None or token != self._headers_token:
+            self._headers = {
+                'Authorization': f'Bearer {token}',
+                'Content-Type': 'application/json'
+            }
+            self._headers_token = token
+        return self._headers
 
     def _make_api_request(self, method: str, path: str, params: Optional[Dict] = None,
-                          json_data: Optional[Dict] = None, max_retries: int = 2) -> requests.Response:
+                          json_data: Optional[Dict] = None, max_retries: int = 2,
+                          stream: bool = False) -> requests.Response:
         """
         Make an API request to ExtremeCloudIQ, handling token renewal on 401 errors and rate-limiting.
+        Every request is paced by the account's shared rate limiter.
 
         Args:
             method (str): HTTP method (e.g., 'GET', 'POST').
@@ -85,6 +669,7 @@ class ExtremeCloudAccount(BaseAccount):
             params (Optional[Dict]): Query parameters for the request.
             json_data (Optional[Dict]): JSON data for the request body.
             max_retries (int): Number of retries for 401 or 429 errors.
+            stream (bool): Do not read the body yet; the caller must close the response.
 
         Returns:
             requests.Response: The response object from the API call.
@@ -97,31 +682,50 @@ class ExtremeCloudAccount(BaseAccount):
         
         for attempt in range(max_retries + 1):
             headers = self._make_headers()
+            if attempt:
+                self.metrics.inc('retries')
             try:
-                response = requests.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    params=params,
-                    json=json_data,
-                    verify=self.verify_ssl,
-                    timeout=60
-                )
+                self.rate_limiter.acquire()
+                self.metrics.inc('requests')
+                with self.request_slots or nullcontext():
+                    response = self.session.request(
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        params=params,
+                        json=json_data,
+                        timeout=60,
+                        stream=stream
+                    )
+                self.rate_limiter.update_from_headers(response.headers)
 
+                if response.status_code in (401, 429):
+                    self.metrics.inc(f'http_{response.status_code}')
                 if response.status_code == 401 and attempt < max_retries:
                     logger.info(f"{ColorCodes.WARNING}Received 401, renewing token (attempt {attempt+1}/{max_retries+1}){ColorCodes.ENDC}")
-                    self._auth_token = None  # Force token refresh
+                    self.invalidate_token(headers['Authorization'].split(' ', 1)[1])  # Force token refresh
+                    response.close()
                     continue
                 elif response.status_code == 429 and attempt < max_retries:
-                    logger.warning(f"Rate limit (429) hit, retrying after delay (attempt {attempt+1}/{max_retries+1})")
-                    time.sleep(2 ** attempt * 5)  # Exponential backoff: 5s, 10s, 20s
+                    delay = ExtremeCloudRateLimiter.parse_retry_after(response.headers.get('Retry-After'))
+                    if delay is None:
+                        delay = 2 ** attempt * 5  # Exponential backoff: 5s, 10s, 20s
+                    logger.warning(f"Rate limit (429) hit, retrying in {delay:.1f}s (attempt {attempt+1}/{max_retries+1})")
+                    self.rate_limiter.block_for(delay)  # Pauses concurrent requests as well
+                    response.close()
                     continue
                 
                 response.raise_for_status()
                 return response
 
             except requests.exceptions.RequestException as e:
+                self.metrics.inc('request_errors')
+                status = e.response.status_code if e.response is not None else None
+                if isinstance(e, requests.exceptions.Timeout) or (status or 0) >= 500:
+                    self.metrics.inc('server_errors')
                 logger.error(f"API request to {path} failed (attempt {attempt+1}/{max_retries+1}): {e}")
+                if status is not None and 400 <= status < 500:
+                    raise  # Client errors do not go away by retrying
                 if attempt < max_retries:
                     time.sleep(2 ** attempt * 5)  # Exponential backoff
                 else:
@@ -133,8 +737,30 @@ class ExtremeCloudAccount(BaseAccount):
 class ExtremeCloudDevice(BaseObject):
     """
     Device object for ExtremeCloudIQ devices
+
+    The inventory fields are normalised once when the device is created, the raw API dict
+    stays available in self.data for BaseObject consumers. With the account option
+    'field_projection' the API only returns the fields listed in _API_FIELDS, which keeps
+    the raw dicts of large fleets small.
     """
-    def __init__(self, account: ExtremeCloudAccount, data: dict):
+    _INVENTORY_PREFIX = 'extremecloud_'
+    # Raw API fields copied to the inventory under the prefixed key
+    _INVENTORY_ATTRS = (
+        'create_time', 'update_time', 'org_id', 'service_tag',
+        'device_function', 'software_version', 'device_admin_state',
+        'last_connect_time', 'network_policy_name', 'primary_ntp_server_address',
+        'primary_dns_server_address', 'subnet_mask', 'default_gateway',
+        'ipv6_address', 'ipv6_netmask', 'simulated', 'display_version',
+        'active_clients', 'location_id', 'country_code', 'description',
+        'config_mismatch', 'managed_by', 'thread0_eui64', 'thread0_ext_mac',
+        'mgt_vlan', 'visible'
+    )
+    _INVENTORY_FIELDS = tuple(zip(_INVENTORY_ATTRS, map(_INVENTORY_PREFIX.__add__, _INVENTORY_ATTRS)))
+    # All raw API fields read by this class, used to request only these from the API
+    _API_FIELDS = ('id', 'hostname', 'ip_address', 'mac_address', 'serial_number', 'product_type',
+                   'locations', 'connected', 'system_up_time') + _INVENTORY_ATTRS
+
+    def __init__(self, account: ExtremeCloudAccount, data: dict, now_ms: Optional[int] = None):
         super().__init__(account, data)
         self.hostname = data.get('hostname', '')
         self.ip = data.get('ip_address', '')
@@ -143,8 +769,25 @@ class ExtremeCloudDevice(BaseObject):
         self.device_type = data.get('product_type', '')
         self.location = self._format_location(data.get('locations', []))
         self.status = 'up' if data.get('connected', False) else 'down'
-        self.uptime = ExtremeCloudAPI._calculate_uptime(data.get('system_up_time'))
+        self.uptime = ExtremeCloudAPI._calculate_uptime(data.get('system_up_time'), now_ms)
         self.sync_id = str(data.get('id', ''))
+        self.boot_timestamp = data.get('system_up_time')
+        self.update_time = data.get('update_time')
+        self.extra_fields = tuple((key, data[attr]) for attr, key in self._INVENTORY_FIELDS if attr in data)
+
+    @classmethod
+    def from_page(cls, account: ExtremeCloudAccount, page: List[Dict],
+                  now_ms: Optional[int] = None) -> List['ExtremeCloudDevice']:
+        """
+        Normalise a whole page of raw devices in one pass.
+        The clock is read once for the page (unless now_ms is given, e.g. the time a replayed
+        page was recorded), so all uptimes of a page share the same reference time.
+        The MAC and uptime formatters are not memoised per page: MAC addresses and boot times
+        are unique per device, so a cache would only add a lookup for every device.
+        """
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        return [cls(account, data, now_ms) for data in page]
 
     @staticmethod
     def _format_location(locations: List[Dict]) -> str:
@@ -157,6 +800,9 @@ class ExtremeCloudDevice(BaseObject):
         """Return unique identifier for the device (serial or hostname)."""
         return self.serial or self.hostname
 
+    def __repr__(self) -> str:
+        return f"<ExtremeCloudDevice id={self.sync_id} hostname={self.hostname!r} serial={self.serial!r}>"
+
     def as_dict(self) -> Dict:
         """Return device data as dictionary for CMDBSyncer inventory."""
         inventory = {
@@ -170,18 +816,7 @@ class ExtremeCloudDevice(BaseObject):
             'uptime': self.uptime,
             'manufacturer': 'extreme_networks'
         }
-        for attr in [
-            'create_time', 'update_time', 'org_id', 'service_tag',
-            'device_function', 'software_version', 'device_admin_state',
-            'last_connect_time', 'network_policy_name', 'primary_ntp_server_address',
-            'primary_dns_server_address', 'subnet_mask', 'default_gateway',
-            'ipv6_address', 'ipv6_netmask', 'simulated', 'display_version',
-            'active_clients', 'location_id', 'country_code', 'description',
-            'config_mismatch', 'managed_by', 'thread0_eui64', 'thread0_ext_mac',
-            'mgt_vlan', 'visible'
-        ]:
-            if attr in self.data:
-                inventory[f'{ExtremeCloudAPI._INVENTORY_PREFIX}{attr}'] = self.data[attr]
+        inventory.update(self.extra_fields)
         return inventory
 
 class ExtremeCloudAPI(BasePlugin):
@@ -189,179 +824,1498 @@ class ExtremeCloudAPI(BasePlugin):
     Plugin class for ExtremeCloudIQ integration with CMDBSyncer
     """
     # Constants for API paths and inventory prefix
-    _INVENTORY_PREFIX = 'extremecloud_'
+    _INVENTORY_PREFIX = ExtremeCloudDevice._INVENTORY_PREFIX
     _API_PATH_LOGIN = '/login'
     _API_PATH_DEVICES = '/devices'
     _API_PATH_INTERFACES_BASE = '/devices/'  # Base path for potential interface endpoint
+    _FINGERPRINT_KEY = 'fingerprint'
+    # Interface attributes copied to the inventory, the MAC address is formatted separately
+    _INTERFACE_ATTRS = (
+        'name', 'status', 'speed', 'description',
+        'admin_status', 'oper_status', 'mtu', 'vlan'
+    )
+    _INTERFACE_BULK_LIMIT = 10000
+    _PROJECTION_FIELDS = [field.upper() for field in ExtremeCloudDevice._API_FIELDS]
+    _PAGE_SCALAR_KEYS = ('page', 'count', 'total_pages', 'total_count')
+    _INCREMENTAL_OVERLAP_MS = 5 * 60 * 1000  # Re-read changes of the last minutes to tolerate clock skew
+    _PAGE_SIZE = 100  # Initial page size, tuned per account afterwards
+    _MIN_PAGE_SIZE = 10
 
     def __init__(self):
         super().__init__()
         self.name = 'extremecloud'
         self.account_class = ExtremeCloudAccount
         self.object_class = ExtremeCloudDevice
+        self.stats = Counter()  # Host counters of the last inventorize run
+        self.metrics = None  # ExtremeCloudSyncMetrics of the last inventorize run
+        self.failed_page = None  # Page that ended the last device fetch early, None if it was complete
+        self.dry_run_report = None  # Report of the last inventorize run in dry run mode, see dry_run
 
     @staticmethod
     def _format_mac_address(mac: str) -> str:
         """Format a MAC address from a 12-character string to XX:XX:XX:XX:XX:XX."""
         if mac and len(mac) == 12:
-            return ':'.join(mac[i:i+2] for i in range(0, len(mac), 2)).upper()
+            return f'{mac[0:2]}:{mac[2:4]}:{mac[4:6]}:{mac[6:8]}:{mac[8:10]}:{mac[10:12]}'.upper()
         return mac.upper() if mac else ''
 
     @staticmethod
-    def _calculate_uptime(timestamp_ms: Optional[float]) -> Optional[str]:
+    def _calculate_uptime(timestamp_ms: Optional[float], now_ms: Optional[int] = None) -> Optional[str]:
         """
         Calculate uptime from a timestamp (in milliseconds) to a string
         in the format 'X days, HH:MM:SS' or None/error string on failure.
+        now_ms is the current time in milliseconds; ExtremeCloudDevice.from_page takes it once per page.
         """
         if not isinstance(timestamp_ms, (int, float)):
             return None
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
         try:
-            current_time_ms = int(time.time() * 1000)
-            uptime_ms = current_time_ms - int(timestamp_ms)
-            if uptime_ms < 0:
-                return "Timestamp is in the future"
-            uptime_delta = datetime.timedelta(milliseconds=uptime_ms)
-            days = uptime_delta.days
-            if days > 2000:
-                return "offline"
-            hours, remainder = divmod(uptime_delta.seconds, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            return f"{days} days, {hours:02}:{minutes:02}:{seconds:02}"
+            uptime_ms = now_ms - int(timestamp_ms)
         except OverflowError:
             return "Uptime too large for timedelta"
-        except TypeError:
+        if uptime_ms < 0:
+            return "Timestamp is in the future"
+        # Plain integer arithmetic, same result as going through datetime.timedelta
+        days, remainder = divmod(uptime_ms // 1000, 86400)
+        if days > datetime.timedelta.max.days:
+            return "Uptime too large for timedelta"
+        if days > 2000:
+            return "offline"
+        hours, remainder = divmod(remainder, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        return f"{days} days, {hours:02}:{minutes:02}:{seconds:02}"
+
+    @staticmethod
+    def _format_timestamp_ms(timestamp_ms: Optional[float]) -> Optional[str]:
+        """Convert an epoch timestamp in milliseconds (e.g. the boot time) to an ISO 8601 UTC string."""
+        if not isinstance(timestamp_ms, (int, float)):
+            return None
+        try:
+            boot_time = datetime.datetime.fromtimestamp(timestamp_ms / 1000, tz=datetime.timezone.utc)
+            return boot_time.isoformat(timespec='seconds')
+        except (OverflowError, OSError, ValueError):
             return None
 
-    def fetch_objects(self, account: ExtremeCloudAccount) -> List[ExtremeCloudDevice]:
+    @staticmethod
+    def _fingerprint(inventory: Dict) -> str:
+        """Return a stable hash of an inventory dict."""
+        payload = json.dumps(inventory, sort_keys=True, default=str, separators=(',', ':'))
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _parse_timestamp_ms(value) -> Optional[int]:
+        """Convert an API timestamp (epoch milliseconds or ISO 8601 string) to epoch milliseconds."""
+        if isinstance(value, (int, float)):
+            return int(value)
+        if not isinstance(value, str) or not value:
+            return None
+        try:
+            parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+        return int(parsed.timestamp() * 1000)
+
+    def _fetch_page(self, account: ExtremeCloudAccount, page: int, page_size: int,
+                    extra_params: Optional[Dict] = None) -> Dict:
+        """
+        Fetch a single page of devices and return the decoded response body.
+
+        With the account option 'field_projection' enabled, only the fields ExtremeCloudDevice
+        maps are requested. With the account option 'stream_json' enabled and ijson installed,
+        the body is parsed incrementally while it is downloaded, so it is never held in memory
+        as a whole; this is slower than the default response.json().
+        """
+        params = {'page': page, 'limit': page_size}
+        if account.field_projection:
+            params['fields'] = self._PROJECTION_FIELDS
+        if extra_params:
+            params.update(extra_params)
+        with account._make_api_request('GET', self._API_PATH_DEVICES, params=params,
+                                       stream=account.stream_json) as response:
+            account.metrics.observe_page_latency(response.elapsed.total_seconds())
+            started = time.perf_counter()
+            if account.stream_json:
+                response.raw.decode_content = True  # Let urllib3 undo the gzip encoding
+                body = ExtremeCloudCountingReader(response.raw)
+                data = self._parse_page_stream(body)
+                page_bytes = body.bytes_read
+            else:
+                data = response.json()
+                page_bytes = len(response.content)
+            account.metrics.add_time('parse', time.perf_counter() - started)
+            # Decoded size, Content-Length is missing for chunked and compressed for gzip responses
+            account.metrics.inc('page_bytes', page_bytes)
+        account.metrics.inc('pages')
+        if account.recorder is not None:
+            account.recorder.write(page, data)
+        return data
+
+    def _parse_page_stream(self, stream) -> Dict:
+        """
+        Parse a /devices response body from a file-like stream with ijson.
+        Only 'data' and the paging counters are kept. 'data' is returned as sent, so a body
+        without a device list (e.g. an error object) fails the caller's list check like
+        response.json() would.
+        """
+        result = {}
+        builder = None
+        target = None  # Prefix of the value the builder collects, 'data' or 'data.item'
+        for prefix, event, value in ijson.parse(stream, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == target and event in ('end_map', 'end_array'):
+                    if target == 'data.item':
+                        result['data'].append(builder.value)
+                    else:
+                        result['data'] = builder.value
+                    builder = None
+            elif prefix in ('data', 'data.item') and event in ('start_map', 'start_array') \
+                    and not (prefix == 'data' and event == 'start_array'):
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                target = prefix
+            elif prefix == 'data':
+                if event == 'start_array':
+                    result['data'] = []
+                elif event != 'end_array':
+                    result['data'] = value  # Scalar, e.g. null
+            elif prefix == 'data.item':
+                result['data'].append(value)
+            elif prefix in self._PAGE_SCALAR_KEYS and event == 'number':
+                result[prefix] = value
+        return result
+
+    def _page_size(self, account: ExtremeCloudAccount) -> int:
         """
-        Fetch devices from ExtremeCloudIQ API with pagination.
+        Return the /devices page size of the account: the account option 'page_size' if set,
+        otherwise the size tuned by previous runs (see _tune_page_size), initially 100.
+        Without a sync state store (no database, e.g. a fetch-only benchmark) the initial size is used.
+        """
+        if account.page_size is None:
+            fixed = account.get_int_option('page_size', 0)
+            if fixed > 0:
+                account.page_size = fixed
+            else:
+                try:
+                    account.page_size = account.state.get('page_size', self._PAGE_SIZE)
+                except (ConnectionFailure, PyMongoError) as e:
+                    logger.warning(f"Sync state not available ({e}), using the page size {self._PAGE_SIZE}")
+                    account.page_size = self._PAGE_SIZE
+        return account.page_size
+
+    @staticmethod
+    def _remember_page_size(account: ExtremeCloudAccount, page_size: int) -> None:
+        """
+        Store a page size the API capped or rejected as the largest the account may use.
+        Skipped without a sync state store, the size then only applies to this run.
+        """
+        try:
+            account.state.set(page_size=page_size, page_size_limit=page_size)
+        except (ConnectionFailure, PyMongoError) as e:
+            logger.debug(f"Page size {page_size} not stored, sync state not available ({e})")
+
+    def _fetch_first_page(self, account: ExtremeCloudAccount, page: int,
+                          extra_params: Optional[Dict] = None) -> Tuple[Dict, int]:
+        """
+        Fetch the first page of a run and return it with the page size to use for the following pages.
+
+        A page size the API rejects (400/422 naming the limit, see _is_page_size_error) is halved
+        until it is accepted. A page 0 that is full but smaller than requested, while more devices
+        exist, shows that the API capped the size; the sizes found this way are remembered as the
+        largest the account may use. Other client errors, e.g. a rejected sort order or field
+        projection, are raised to the caller.
+        """
+        page_size = self._page_size(account)
+        while True:
+            try:
+                data = self._fetch_page(account, page, page_size, extra_params)
+                break
+            except requests.exceptions.HTTPError as e:
+                if not self._is_page_size_error(e.response) or page_size <= self._MIN_PAGE_SIZE:
+                    raise
+                page_size = max(page_size // 2, self._MIN_PAGE_SIZE)
+                logger.warning(f"Page size rejected by the API ({e.response.status_code}), retrying with {page_size}")
+                self._remember_page_size(account, page_size)
+
+        devices = data.get('data')
+        more = (data.get('total_count') or 0) > len(devices or []) or (data.get('total_pages') or 0) > 1
+        if page == 0 and isinstance(devices, list) and 0 < len(devices) < page_size and more:
+            logger.info(f"API returned {len(devices)} devices per page instead of {page_size}, using that page size")
+            page_size = len(devices)
+            self._remember_page_size(account, page_size)
+        account.page_size = page_size
+        return data, page_size
+
+    @staticmethod
+    def _is_page_size_error(response: Optional[requests.Response]) -> bool:
+        """
+        Check if a 400/422 response rejects the page size: its error message names the limit
+        and none of the other parameters (sort order, field projection) that may be rejected.
+        """
+        if response is None or response.status_code not in (400, 422):
+            return False
+        try:
+            message = response.text or ''
+        except Exception:  # Body not readable, e.g. connection already closed
+            return False
+        if re.search(r'sort_?field|sort_?order|\bfields?\b', message, re.IGNORECASE):
+            return False
+        return re.search(r'\blimit\b|page[ _-]?size', message, re.IGNORECASE) is not None
+
+    def _tune_page_size(self, account: ExtremeCloudAccount) -> None:
+        """
+        Adapt the page size remembered for the account to the /devices requests of this run.
+
+        After timeouts or 5xx responses it is halved. Otherwise it is scaled so a page takes
+        about 'page_latency_target' seconds (default 2) and at most 'page_bytes_max' decoded bytes
+        (default 4 MB), growing at most by a factor of 2 per run and staying within the largest
+        size the API accepted and 'page_size_max' (default 1000, 0 for no cap). Not done if
+        'page_size' is set.
+        """
+        if account.get_int_option('page_size', 0) > 0:
+            return
+        metrics = account.metrics
+        pages = metrics.counters['pages']
+        if not pages:
+            return
+        page_size = self._page_size(account)
+        if metrics.counters['server_errors']:
+            tuned = page_size // 2
+        else:
+            latency = metrics.page_latency_sum / max(sum(metrics.page_latency_counts), 1)
+            target = account.get_float_option('page_latency_target', 2.0)
+            tuned = page_size * min(target / latency, 2.0) if latency > 0 else page_size * 2
+            page_bytes = metrics.counters['page_bytes'] / pages
+            if page_bytes:
+                tuned = min(tuned, page_size * account.get_int_option('page_bytes_max', 4 * 1024 * 1024) / page_bytes)
+        # A 'page_size_max' of 0 (or less) means no cap
+        limits = [account.get_int_option('page_size_max', 1000), account.state.get('page_size_limit')]
+        tuned = min([int(tuned) // 10 * 10] + [limit for limit in limits if limit and limit > 0])
+        tuned = max(tuned, self._MIN_PAGE_SIZE)
+        if tuned != page_size:
+            logger.info(f"Changing the page size from {page_size} to {tuned} for the next run")
+            account.state.set(page_size=tuned)
+
+    @staticmethod
+    def _get_total_pages(data: Dict, page_size: int) -> Optional[int]:
+        """
+        Read the total number of pages from a /devices response.
+        Uses 'total_pages' if present, otherwise derives it from 'total_count'.
+        """
+        total_pages = data.get('total_pages')
+        if isinstance(total_pages, int):
+            return total_pages
+        total_count = data.get('total_count')
+        if isinstance(total_count, int):
+            return -(-total_count // page_size)
+        return None
+
+    def _expected_devices(self, data: Dict, page_size: int, first_page: int = 0,
+                          end_page: Optional[int] = None) -> Optional[int]:
+        """Estimate the number of devices on the pages from first_page up to end_page, for the progress ETA."""
+        total_count = data.get('total_count')
+        if not isinstance(total_count, int):
+            total_pages = self._get_total_pages(data, page_size)
+            if total_pages is None:
+                return None
+            total_count = total_pages * page_size
+        if end_page is not None:
+            total_count = min(total_count, end_page * page_size)
+        return max(total_count - first_page * page_size, 0)
+
+    @staticmethod
+    def _log_detail(account: ExtremeCloudAccount, message: str, *args, color: str = '',
+                    warning: bool = False) -> None:
+        """
+        Log a per-page or per-device message. In high volume logging mode it is demoted to debug
+        level and only formatted if debug logging is enabled.
+        """
+        if account.high_volume_logging:
+            logger.debug(message, *args)
+        elif warning:
+            logger.warning(message, *args)
+        elif color:
+            logger.info(f"{color}{message % args}{ColorCodes.ENDC}")
+        else:
+            logger.info(message, *args)
+
+    def _page_fetched(self, account: ExtremeCloudAccount, page: int, count: int, total_fetched: int,
+                      expected: Optional[int] = None) -> None:
+        """Report a fetched page, as log line or, in high volume logging mode, as progress of the run."""
+        self._log_detail(account, "Fetched %d devices on page %d (Total: %d)", count, page, total_fetched)
+        for progress in (account.fetch_progress, account.sync_progress):
+            if progress is not None:
+                progress.set_total(expected)
+        if account.fetch_progress is not None:
+            account.fetch_progress.add(count)
+
+    def fetch_objects(self, account: ExtremeCloudAccount, start_page: int = 0) -> List[ExtremeCloudDevice]:
+        """
+        Fetch devices from ExtremeCloudIQ API with pagination, starting at start_page.
+        Pages are fetched in parallel if the account option 'page_concurrency' is greater than 1.
+
+        If a page fails, the devices fetched so far are returned and the page is stored in
+        self.failed_page, so the caller can tell the partial list from the complete fleet.
         """
         logger.info(f"{ColorCodes.OKGREEN}Starting ExtremeCloudIQ Device Sync{ColorCodes.ENDC}")
-        page = 0
-        page_size = 100
+        account.rate_limiter.reset_stats()
+        self.failed_page = None
+        if account.high_volume_logging:
+            account.fetch_progress = ExtremeCloudSyncProgress('fetched', account.progress_interval)
+        try:
+            if account.page_concurrency > 1:
+                return self._fetch_objects_parallel(account, start_page)
+            return self._fetch_objects_sequential(account, start_page)
+        finally:
+            logger.info(f"Waited {account.rate_limiter.wait_time:.1f}s on the rate limiter")
+            if account.fetch_progress is not None:
+                if self.failed_page is not None:
+                    account.fetch_progress.add(errors=1)
+                account.fetch_progress.log_summary()
+                account.fetch_progress = None
+
+    def _fetch_objects_sequential(self, account: ExtremeCloudAccount, start_page: int = 0) -> List[ExtremeCloudDevice]:
+        """
+        Fetch devices page by page until an empty or short page is returned.
+        """
+        page = start_page
+        page_size = None
+        expected = None
         all_devices = []
         total_fetched = 0
 
         while True:
             try:
-                params = {'page': page, 'limit': page_size}
-                response = account._make_api_request('GET', self._API_PATH_DEVICES, params=params)
-                data = response.json()
+                if page_size is None:
+                    data, page_size = self._fetch_first_page(account, page)
+                    expected = self._expected_devices(data, page_size, start_page)
+                else:
+                    data = self._fetch_page(account, page, page_size)
                 devices = data.get('data', [])
                 
                 if not isinstance(devices, list):
                     logger.warning(f"Expected a list of devices, got: {type(devices)}. Response: {data}")
+                    self.failed_page = page
                     break
 
                 if not devices:
                     logger.info(f"No devices found on page {page}, stopping pagination")
                     break
 
-                all_devices.extend([ExtremeCloudDevice(account, device) for device in devices])
+                all_devices.extend(ExtremeCloudDevice.from_page(account, devices))
                 total_fetched += len(devices)
-                logger.info(f"Fetched {len(devices)} devices on page {page} (Total: {total_fetched})")
+                self._page_fetched(account, page, len(devices), total_fetched, expected)
 
                 if len(devices) < page_size:
                     break
 
                 page += 1
-                time.sleep(3)  # Avoid overwhelming the API
 
             except requests.exceptions.RequestException as e:
                 logger.error(f"Error fetching devices (page {page}): {e}")
+                self.failed_page = page
                 break
             except Exception as e:
                 logger.error(f"Unexpected error processing devices (page {page}): {e}")
+                self.failed_page = page
                 break
 
         logger.info(f"Finished fetching {total_fetched} ExtremeCloudIQ devices")
         return all_devices
 
-    def inventorize(self, account: ExtremeCloudAccount, rewrite_config: Optional[Dict] = None) -> List[Dict]:
+    def _fetch_objects_parallel(self, account: ExtremeCloudAccount, start_page: int = 0) -> List[ExtremeCloudDevice]:
         """
-        Synchronize devices to CMDBSyncer inventory.
+        Fetch all pages with a bounded worker pool, see iter_device_pages.
+        Devices are returned in page order.
         """
-        devices = self.fetch_objects(account)
-        results = []
-        
+        all_devices = []
+        try:
+            for devices in self.iter_device_pages(account, start_page):
+                all_devices.extend(devices)
+        except Exception:
+            if self.failed_page is None:
+                raise
+        logger.info(f"Finished fetching {len(all_devices)} ExtremeCloudIQ devices")
+        return all_devices
+
+    def iter_device_pages(self, account: ExtremeCloudAccount, start_page: int = 0,
+                          checkpoint: bool = False,
+                          end_page: Optional[int] = None) -> Iterator[List[ExtremeCloudDevice]]:
+        """
+        Yield the devices of each page in page order while the following pages are already in flight.
+        Only the pages from start_page up to end_page (exclusive, default: all) are read.
+
+        The first page tells the total page count. After that up to 'page_concurrency' pages
+        are fetched ahead by a worker pool, so memory stays bounded by a few pages regardless
+        of fleet size. If the API reports no total count, one page is prefetched until a short
+        or empty page ends the pagination.
+
+        With checkpoint enabled, the offset after each page is stored in the sync state once the
+        caller asks for the next page, i.e. after it has processed the page, see _start_device_sync.
+
+        Raises:
+            Exception: If any page cannot be fetched, so that a partial device list
+                is never treated as the complete fleet. The page is stored in self.failed_page.
+        """
+        first_page = start_page
+        try:
+            data, page_size = self._fetch_first_page(account, first_page)
+        except Exception:
+            self.failed_page = first_page
+            raise
+        total_pages = self._get_total_pages(data, page_size)
+        stop_page = min((last for last in (total_pages, end_page) if last is not None), default=None)
+        expected = self._expected_devices(data, page_size, first_page, end_page)
+        window = max(account.page_concurrency, 1) if stop_page is not None else 1
+        if total_pages is not None:
+            logger.info(f"Fetching {stop_page - first_page} of {total_pages} pages with {window} parallel workers")
+
+        page = first_page
+        next_page = first_page + 1
+        total_fetched = 0
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=window, thread_name_prefix='extremecloud') as executor:
+            try:
+                while True:
+                    while len(pending) < window and (stop_page is None or next_page < stop_page):
+                        pending.append((next_page, executor.submit(self._fetch_page, account, next_page, page_size)))
+                        next_page += 1
+
+                    devices = data.get('data', [])
+                    if not isinstance(devices, list):
+                        self.failed_page = page
+                        raise Exception(f"Expected a list of devices on page {page}, got: {type(devices)}")
+                    total_fetched += len(devices)
+                    self._page_fetched(account, page, len(devices), total_fetched, expected)
+                    if devices:
+                        yield ExtremeCloudDevice.from_page(account, devices)
+                    if checkpoint:
+                        account.state.set(device_sync_offset=(page + 1) * page_size)
+
+                    if total_pages is None and len(devices) < page_size:
+                        break
+                    if not pending:
+                        break
+
+                    page, future = pending.popleft()
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        logger.error(f"Error fetching devices (page {page}): {e}")
+                        self.failed_page = page
+                        raise Exception(f"Failed to fetch page {page}, aborting device sync: {e}") from e
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    def iter_changed_device_pages(self, account: ExtremeCloudAccount,
+                                  since_ms: int) -> Iterator[List[ExtremeCloudDevice]]:
+        """
+        Yield the devices changed since the given update_time checkpoint, page by page.
+
+        Pages are requested newest first (account option 'incremental_sort_field', default
+        'UPDATE_TIME'). Pagination stops at the first page reaching back past the checkpoint.
+        If the API does not return the pages in that order, all pages are read and the
+        devices are filtered locally instead. If it rejects the sort parameters (400/422 on
+        the first page), all pages are read unsorted and filtered by update_time.
+
+        Raises:
+            Exception: If a page cannot be fetched.
+        """
+        page = 0
+        page_size = self._page_size(account)
+        sort_params = {
+            'sortField': account.account.get('incremental_sort_field') or 'UPDATE_TIME',
+            'sortOrder': 'DESC',
+        }
+        previous_oldest = None
+        total_changed = 0
+        while True:
+            try:
+                if page == 0:
+                    try:
+                        data, page_size = self._fetch_first_page(account, page, sort_params)
+                    except requests.exceptions.HTTPError as e:
+                        if e.response is None or e.response.status_code not in (400, 422):
+                            raise
+                        logger.warning(f"Sorting by {sort_params['sortField']} rejected by the API "
+                                       f"({e.response.status_code}), scanning all devices instead")
+                        sort_params = None
+                        data, page_size = self._fetch_first_page(account, page)
+                else:
+                    data = self._fetch_page(account, page, page_size, sort_params)
+            except Exception as e:
+                logger.error(f"Error fetching changed devices (page {page}): {e}")
+                raise Exception(f"Failed to fetch page {page}, aborting incremental sync: {e}") from e
+            devices = data.get('data', [])
+            if not isinstance(devices, list):
+                raise Exception(f"Expected a list of devices on page {page}, got: {type(devices)}")
+
+            update_times = [self._parse_timestamp_ms(device.get('update_time')) or 0 for device in devices]
+            changed = [device for device, updated in zip(devices, update_times) if updated > since_ms]
+            total_changed += len(changed)
+            self._log_detail(account, "Fetched %d changed devices on page %d (Total: %d)",
+                             len(changed), page, total_changed)
+            if changed:
+                yield ExtremeCloudDevice.from_page(account, changed)
+
+            if len(devices) < page_size:
+                break
+            sorted_desc = sort_params is not None \
+                and all(a >= b for a, b in zip(update_times, update_times[1:])) \
+                and (previous_oldest is None or previous_oldest >= update_times[0])
+            if sorted_desc and len(changed) < len(devices):
+                break
+            previous_oldest = update_times[-1] if update_times else previous_oldest
+            page += 1
+
+    def iter_recorded_pages(self, account: ExtremeCloudAccount) -> Iterator[List[ExtremeCloudDevice]]:
+        """
+        Yield the devices of the pages recorded with 'record_dir', read from the recording named
+        by the account option 'replay_file' instead of the API. Uptimes are calculated relative
+        to the time each page was recorded, so replaying the same recording gives the same inventory.
+
+        Raises:
+            Exception: If no recording is found.
+        """
+        account_name = account.account.get('name', account.state.account_id)
+        path = ExtremeCloudPageRecorder.find_recording(account.replay_file, account_name)
+        if path is None:
+            raise Exception(f"No recording of account {account_name} found at {account.replay_file}")
+        logger.info(f"{ColorCodes.OKGREEN}Replaying ExtremeCloudIQ Device Sync from {path}{ColorCodes.ENDC}")
+        total = 0
+        for page in ExtremeCloudPageRecorder.read_pages(path):
+            devices = page.get('data') or []
+            total += len(devices)
+            if devices:
+                yield ExtremeCloudDevice.from_page(account, devices, int(page['recorded'] * 1000))
+        logger.info(f"Replayed {total} ExtremeCloudIQ devices")
+
+    def _incremental_since(self, account: ExtremeCloudAccount) -> Optional[int]:
+        """
+        Return the update_time checkpoint for an incremental run, or None if a full sync is due.
+
+        A full sync runs if there is no checkpoint yet or the last full sync is older than the
+        account option 'full_sync_interval' (hours, default 24). Incremental runs do not mark
+        unchanged hosts as seen, so the interval must stay below the syncer's cleanup age.
+        """
+        if account.replay_file:
+            return None
+        checkpoint = account.state.get('update_time_checkpoint')
+        last_full_sync = account.state.get('last_full_sync', 0)
+        interval = account.get_float_option('full_sync_interval', 24) * 3600
+        if checkpoint is None or time.time() - last_full_sync >= interval:
+            return None
+        return max(checkpoint - self._INCREMENTAL_OVERLAP_MS, 0)
+
+    def _newest_update_time(self, devices: List[ExtremeCloudDevice]) -> int:
+        """Return the newest update_time of the given devices in epoch milliseconds (0 if none)."""
+        return max((self._parse_timestamp_ms(device.update_time) or 0 for device in devices),
+                   default=0)
+
+    def _build_inventory(self, device: ExtremeCloudDevice, delta: bool) -> Dict:
+        """
+        Return the inventory of a device.
+
+        In delta mode the moving 'uptime' string is replaced by the stable 'boot_time',
+        and a fingerprint of the resulting inventory is added.
+        """
+        inventory = device.as_dict()
+        if delta:
+            inventory.pop('uptime', None)
+            inventory['boot_time'] = self._format_timestamp_ms(device.boot_timestamp)
+            inventory[self._FINGERPRINT_KEY] = self._fingerprint(inventory)
+        return inventory
+
+    def _stored_fingerprint(self, db_host: Host) -> Optional[str]:
+        """Return the fingerprint saved with the host's ExtremeCloud inventory, if any."""
+        for key, value in db_host.inventory.items():
+            if key.startswith(self._INVENTORY_PREFIX) and key.endswith(self._FINGERPRINT_KEY):
+                return value
+        return None
+
+    def _apply_device(self, account: ExtremeCloudAccount, db_host: Host, device: ExtremeCloudDevice,
+                      delta: bool) -> Tuple[str, Dict]:
+        """
+        Apply a device to its host in memory.
+
+        Returns:
+            Tuple[str, Dict]: The status ('modified', 'unchanged' or 'foreign') and the inventory.
+                Unchanged hosts only get their seen state updated; foreign hosts must not be saved.
+        """
+        inventory = self._build_inventory(device, delta)
+        if not db_host.set_account(account_dict=account.account):
+            return 'foreign', inventory
+        db_host.set_import_seen()
+        if delta and db_host.sync_id == device.sync_id \
+                and self._stored_fingerprint(db_host) == inventory[self._FINGERPRINT_KEY]:
+            return 'unchanged', inventory
+        db_host.update_inventory(self._INVENTORY_PREFIX, inventory)
+        db_host.sync_id = device.sync_id
+        return 'modified', inventory
+
+    def _process_device(self, account: ExtremeCloudAccount, device: ExtremeCloudDevice,
+                        delta: bool = False) -> Optional[Dict]:
+        """
+        Update the CMDBSyncer host for one device.
+
+        Returns:
+            Optional[Dict]: The saved inventory, or None if the device was skipped or unchanged.
+        """
+        hostname = device.hostname
+        if not hostname:
+            self._log_detail(account, "Skipping device without hostname: %r", device, warning=True)
+            self.stats['skipped'] += 1
+            return None
+
+        self._log_detail(account, "Processing device: %s", hostname, color=ColorCodes.HEADER)
+        db_host = Host.get_host(hostname)
+        status, inventory = self._apply_device(account, db_host, device, delta)
+        self.stats[status] += 1
+
+        if status == 'foreign':
+            self._log_detail(account, "Object %s owned by other source, not saved", hostname)
+            return None
+        # For unchanged hosts save() only sends the changed seen fields
+        db_host.save()
+        return inventory if status == 'modified' else None
+
+    def _process_devices_bulk(self, account: ExtremeCloudAccount, devices: List[ExtremeCloudDevice],
+                              delta: bool = False) -> List[Dict]:
+        """
+        Update the CMDBSyncer hosts for a chunk of devices with one read and one bulk write.
+
+        All existing hosts of the chunk are loaded with a single query by hostname, new hosts are
+        created in memory. Inventory, sync_id, seen state and account are applied in memory with
+        the Host methods, so the ownership check of set_account still applies, and the changes
+        and inserts are flushed with one unordered bulk write.
+
+        Returns:
+            List[Dict]: The saved inventories.
+        """
+        by_hostname = {}
         for device in devices:
-            hostname = device.hostname
-            if not hostname:
-                logger.warning(f"Skipping device without hostname: {device.data}")
+            if not device.hostname:
+                self._log_detail(account, "Skipping device without hostname: %r", device, warning=True)
+                self.stats['skipped'] += 1
+                continue
+            by_hostname[device.hostname] = device
+        if not by_hostname:
+            return []
+
+        db_hosts = {db_host.hostname: db_host for db_host in Host.objects(hostname__in=list(by_hostname))}
+        operations = []
+        results = []
+        for hostname, device in by_hostname.items():
+            self._log_detail(account, "Processing device: %s", hostname, color=ColorCodes.HEADER)
+            db_host = db_hosts.get(hostname)
+            if db_host is None:
+                db_host = self._new_host(hostname)
+            status, inventory = self._apply_device(account, db_host, device, delta)
+            self.stats[status] += 1
+            if status == 'foreign':
+                self._log_detail(account, "Object %s owned by other source, not saved", hostname)
                 continue
 
-            logger.info(f"{ColorCodes.HEADER}Processing device: {hostname}{ColorCodes.ENDC}")
-            db_host = Host.get_host(hostname)
-            inventory = device.as_dict()
-            
-            db_host.update_inventory(self._INVENTORY_PREFIX, inventory)
-            db_host.sync_id = device.sync_id
-            db_host.set_import_seen()
-            do_save = db_host.set_account(account_dict=account.account)
-
-            if do_save:
-                db_host.save()
+            operation = self._host_write_operation(db_host)
+            if operation is not None:
+                operations.append(operation)
+            if status == 'modified':
                 results.append(inventory)
-            else:
-                logger.info(f"Object {hostname} owned by other source, not saved")
 
+        failed = self._bulk_write_hosts(operations)
+        if failed:
+            self.stats['write_errors'] += failed
         return results
 
-    """
-    def get_interfaces(self, account: ExtremeCloudAccount) -> None:
-        #Fetch and update interface information for devices.
-        #Placeholder implementation, as the specific API endpoint is unknown.
-        
-        logger.info(f"{ColorCodes.OKGREEN}Starting ExtremeCloudIQ Interface Sync{ColorCodes.ENDC}")
-        # Expected interface attributes (based on typical network device interfaces)
-        interface_attributes = [
-            'name', 'status', 'mac_address', 'speed', 'description',
-            'admin_status', 'oper_status', 'mtu', 'vlan'
-        ]
-
-        for db_host in Host.objects(available=True, source_account_id=str(account.account['_id'])):
-            if not db_host.sync_id:
-                logger.warning(f"No device ID for {db_host.hostname}, skipping interface sync")
+    @staticmethod
+    def _new_host(hostname: str) -> Host:
+        """
+        Create a host in memory like Host.get_host does for unknown hostnames, but without
+        querying for it: the caller already knows it does not exist.
+        """
+        db_host = Host()
+        db_host.hostname = hostname
+        db_host.add_date = datetime.datetime.now()
+        return db_host
+
+    @staticmethod
+    def _host_write_operation(db_host: Host):
+        """
+        Return the bulk write operation that saves the host, or None if nothing changed.
+        For existing hosts this is the same delta Document.save() would send.
+        """
+        if db_host.pk is None:
+            db_host.validate()
+            return InsertOne(db_host.to_mongo().to_dict())
+        sets, unsets = db_host._delta()
+        update = {}
+        if sets:
+            update['$set'] = sets
+        if unsets:
+            update['$unset'] = unsets
+        return UpdateOne({'_id': db_host.pk}, update) if update else None
+
+    @staticmethod
+    def _bulk_write_hosts(operations: List) -> int:
+        """Flush host write operations with one unordered bulk write, returns the number of failed writes."""
+        if not operations:
+            return 0
+        try:
+            Host._get_collection().bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            logger.error(f"Bulk write failed for {len(errors)} of {len(operations)} hosts: "
+                         f"{errors[:3]}")
+            return len(errors)
+        return 0
+
+    def _process_devices(self, account: ExtremeCloudAccount, devices: List[ExtremeCloudDevice],
+                         bulk: bool, delta: bool = False) -> List[Dict]:
+        """Process a chunk of devices, either with bulk writes or host by host."""
+        started = time.perf_counter()
+        try:
+            if bulk:
+                return self._process_devices_bulk(account, devices, delta)
+            results = []
+            for device in devices:
+                inventory = self._process_device(account, device, delta)
+                if inventory is not None:
+                    results.append(inventory)
+            return results
+        finally:
+            account.metrics.add_time('db', time.perf_counter() - started)
+
+    def inventorize(self, account: ExtremeCloudAccount, rewrite_config: Optional[Dict] = None) -> List[Dict]:
+        """
+        Synchronize devices to CMDBSyncer inventory.
+
+        With the account option 'stream_pages' enabled, each page is written to the inventory
+        while the next pages are fetched. In this mode the saved inventories are not collected,
+        to keep memory bounded, and an empty list is returned.
+
+        With the account option 'bulk_writes' enabled, hosts are read and written in chunks
+        (one page when streaming, otherwise 'bulk_size' devices) instead of one by one.
+
+        With the account option 'delta_sync' enabled, hosts whose inventory fingerprint did not
+        change only get their seen state updated, and only modified inventories are returned.
+        The host counters of the run are kept in self.stats, all metrics of the run
+        (see ExtremeCloudSyncMetrics) in self.metrics.
+
+        With the account option 'incremental_sync' enabled, only devices changed since the
+        stored update_time checkpoint are fetched, and a full sync runs every
+        'full_sync_interval' hours, see _incremental_since.
+
+        If a page fails during a full sync, the devices read so far are still written, but the
+        run is flagged as partial: the hosts it did not reach are kept as seen and the next run
+        resumes at the failed page, see _start_device_sync and _finish_device_sync.
+
+        With the account option 'record_dir' set, the pages of full syncs are recorded there,
+        and with 'replay_file' set to such a recording (or the directory, for the newest one),
+        the devices are read from it instead of the API, e.g. to test rewrites and mappings
+        offline. Replayed runs leave the checkpoints and resume position of the account untouched.
+
+        With the account option 'dry_run' enabled, nothing is written: the changes are computed
+        with dry_run, logged, stored in self.dry_run_report, and an empty list is returned.
+
+        With the account option 'high_volume_logging' enabled, the log lines per page and device
+        are demoted to debug level, and instead a progress line with devices/s, ETA and errors so
+        far is logged every 'progress_interval' seconds (default 10), see ExtremeCloudSyncProgress.
+        The summary of the run is logged, and written as JSON to the account option 'summary_file'.
+        """
+        self.stats = Counter()
+        self.failed_page = None
+        account.start_run_metrics()
+        if account.get_bool_option('dry_run', False):
+            self.dry_run_report = self.dry_run(account)
+            self._log_dry_run_report(account, self.dry_run_report)
+            return []
+
+        bulk = account.get_bool_option('bulk_writes', False)
+        delta = account.get_bool_option('delta_sync', False)
+        stream = account.get_bool_option('stream_pages', False)
+        incremental = account.get_bool_option('incremental_sync', False)
+        since = self._incremental_since(account) if incremental else None
+        sync_started = time.time()
+        start_offset, fleet_started = self._start_device_sync(account, since, sync_started)
+
+        results = []
+        newest_update = 0
+        if account.high_volume_logging:
+            account.sync_progress = ExtremeCloudSyncProgress('synced', account.progress_interval)
+        try:
+            for devices in self._open_device_chunks(account, since, stream, bulk, start_offset):
+                if incremental:
+                    newest_update = max(newest_update, self._newest_update_time(devices))
+                errors = self.stats['skipped'] + self.stats['write_errors']
+                saved = self._process_devices(account, devices, bulk, delta)
+                if not stream:
+                    results.extend(saved)
+                if account.sync_progress is not None:
+                    account.sync_progress.add(len(devices), self.stats['skipped'] + self.stats['write_errors'] - errors)
+        except Exception:
+            if self.failed_page is None:
+                raise
+
+        self._finish_device_sync(account, since, incremental, newest_update, fleet_started)
+        self._finish_metrics(account, sync_started)
+        self._log_sync_summary(account, log_wait_time=since is not None or stream)
+        return results
+
+    def _open_device_chunks(self, account: ExtremeCloudAccount, since: Optional[int], stream: bool,
+                            bulk: bool, start_offset: int = 0) -> Iterator[List[ExtremeCloudDevice]]:
+        """
+        Return the chunks of devices to process for a sync run: the changed devices if an
+        incremental checkpoint is given, otherwise all pages from start_offset on as they
+        arrive (stream) or the fully fetched device list cut into 'bulk_size' chunks.
+        """
+        start_page = start_offset // self._page_size(account)
+        if account.replay_file:
+            return self.iter_recorded_pages(account)
+        if since is not None:
+            logger.info(f"{ColorCodes.OKGREEN}Starting incremental ExtremeCloudIQ Device Sync "
+                        f"(changes since {self._format_timestamp_ms(since)}){ColorCodes.ENDC}")
+            account.rate_limiter.reset_stats()
+            return self.iter_changed_device_pages(account, since)
+        if stream:
+            logger.info(f"{ColorCodes.OKGREEN}Starting ExtremeCloudIQ Device Sync (streaming){ColorCodes.ENDC}")
+            account.rate_limiter.reset_stats()
+            return self.iter_device_pages(account, start_page, checkpoint=True)
+        devices = self.fetch_objects(account, start_page)
+        if account.sync_progress is not None:
+            # Measure the sync rate from here, the fetch reported its own progress
+            account.sync_progress = ExtremeCloudSyncProgress('synced', account.progress_interval, len(devices))
+        chunk_size = max(account.get_int_option('bulk_size', 1000), 1) if bulk else max(len(devices), 1)
+        return (devices[start:start + chunk_size] for start in range(0, len(devices), chunk_size))
+
+    def _start_device_sync(self, account: ExtremeCloudAccount, since: Optional[int],
+                           sync_started: float, record: bool = True) -> Tuple[int, float]:
+        """
+        Return the device offset a full sync starts at and the start time of the sync it belongs to.
+
+        A full sync records its position in the sync state while it runs. If the previous run
+        stopped early (failed page or crash) less than 'resume_max_age' hours ago (default 6),
+        it is continued at the stored offset instead of page 0, and the start time of the
+        interrupted run is kept, since the pages before the offset were seen by that run.
+        Resuming can be disabled with the account option 'resumable_sync'. Incremental runs
+        always start at the first page.
+        """
+        if since is not None or account.replay_file:
+            return 0, sync_started
+        offset, started = 0, sync_started
+        if account.get_bool_option('resumable_sync', True):
+            progress = account.state.get_many('device_sync_offset', 'device_sync_started')
+            max_age = account.get_float_option('resume_max_age', 6) * 3600
+            if progress.get('device_sync_offset') and sync_started - progress.get('device_sync_started', 0) < max_age:
+                offset, started = progress['device_sync_offset'], progress['device_sync_started']
+                logger.info(f"Resuming device sync at device {offset} (sync started "
+                            f"{self._format_timestamp_ms(started * 1000)})")
+        account.state.set(device_sync_offset=offset, device_sync_started=started)
+        record_dir = account.account.get('record_dir')
+        if record and record_dir and not offset:
+            try:
+                account.recorder = ExtremeCloudPageRecorder(record_dir, account.account.get('name', account.state.account_id))
+            except OSError as e:
+                logger.error(f"Could not record the device sync to {record_dir}: {e}")
+        return offset, started
+
+    def _finish_device_sync(self, account: ExtremeCloudAccount, since: Optional[int], incremental: bool,
+                            newest_update: int, fleet_started: float) -> None:
+        """
+        Store the sync state at the end of a run.
+
+        A complete full sync clears its resume position and becomes the last full sync.
+        A partial one stores the failed page as resume position, and refreshes the seen state
+        of the hosts of the last complete sync that it did not reach, so that hosts are not
+        aged out because a page failed. The update_time checkpoint is only advanced by
+        complete runs. The page size for the next run is tuned in any case. Replayed runs
+        store nothing.
+        """
+        if account.replay_file:
+            return
+        self._tune_page_size(account)
+        if account.recorder is not None:
+            self._close_recording(account, keep=self.failed_page is None)
+        if self.failed_page is not None:
+            offset = self.failed_page * self._page_size(account)
+            account.state.set(device_sync_offset=offset, device_sync_started=fleet_started)
+            kept = self._keep_unreached_hosts(account, fleet_started)
+            self.stats['kept'] += kept
+            account.metrics.inc('partial_runs')
+            logger.warning(f"Device sync incomplete, page {self.failed_page} failed. {kept} hosts not "
+                           f"reached were kept as seen, the next run resumes at device {offset}")
+            return
+        if incremental:
+            self._save_checkpoint(account, newest_update)
+        if since is None:
+            account.state.set(last_full_sync=fleet_started)
+            account.state.unset('device_sync_offset', 'device_sync_started')
+
+    @staticmethod
+    def _close_recording(account: ExtremeCloudAccount, keep: bool) -> None:
+        """Finish the recording of the run; recordings of partial runs are discarded."""
+        recorder, account.recorder = account.recorder, None
+        try:
+            recorder.close(keep)
+        except OSError as e:
+            logger.error(f"Could not finish the recording {recorder.path}: {e}")
+            return
+        if keep:
+            logger.info(f"Recorded {recorder.pages} pages to {recorder.path}")
+        else:
+            logger.info("Discarded the recording of the incomplete device sync")
+
+    @staticmethod
+    def _keep_unreached_hosts(account: ExtremeCloudAccount, fleet_started: float) -> int:
+        """
+        Mark the hosts seen by the last complete sync, but not since fleet_started, as seen again.
+        Returns the number of hosts updated.
+        """
+        last_full_sync = account.state.get('last_full_sync')
+        if not last_full_sync:
+            return 0
+        return Host.objects(
+            source_account_id=str(account.account['_id']),
+            last_import_seen__gte=datetime.datetime.fromtimestamp(last_full_sync),
+            last_import_seen__lt=datetime.datetime.fromtimestamp(fleet_started),
+        ).update(set__last_import_seen=datetime.datetime.now())
+
+    @staticmethod
+    def _save_checkpoint(account: ExtremeCloudAccount, newest_update: int) -> None:
+        """Store the update_time checkpoint after a successful run."""
+        checkpoint = max(newest_update, account.state.get('update_time_checkpoint') or 0)
+        account.state.set(update_time_checkpoint=checkpoint)
+
+    def _finish_metrics(self, account: ExtremeCloudAccount, sync_started: float) -> ExtremeCloudSyncMetrics:
+        """
+        Complete the metrics of a run with the host counters, total time and rate limiter wait,
+        and write them to the Prometheus text file named by the account option 'metrics_file'.
+        """
+        metrics = account.metrics
+        for status, count in self.stats.items():
+            metrics.inc(f'hosts_{status}', count)
+        metrics.add_time('sync', time.time() - sync_started)
+        metrics.add_time('rate_limit_wait', account.rate_limiter.wait_time)
+        self.metrics = metrics
+        metrics_file = account.account.get('metrics_file')
+        if metrics_file:
+            try:
+                metrics.write_prometheus(metrics_file, account.account.get('name', account.state.account_id))
+            except OSError as e:
+                logger.error(f"Could not write metrics to {metrics_file}: {e}")
+        return metrics
+
+    def dry_run(self, account: ExtremeCloudAccount) -> Dict:
+        """
+        Compute what inventorize would change, without writing anything.
+
+        All devices are fetched (or replayed, see iter_recorded_pages), then the hosts of the
+        account and the hosts with the fetched hostnames are read with one query. Each device is
+        applied to its host in memory like inventorize does ('delta_sync' included), and the
+        host inventory before and after is compared. The hosts are never saved.
+
+        Returns:
+            Dict: The number of fetched 'devices', the field diffs of the hosts that would be
+                'modified' ({hostname: {field: [old, new]}}), the hostnames that would be 'new',
+                the 'orphaned' hosts of the account without device, the 'foreign' hosts owned
+                by another source, and the number of 'unchanged' and 'skipped' devices.
+        """
+        logger.info(f"{ColorCodes.OKGREEN}Starting ExtremeCloudIQ Device Sync (dry run){ColorCodes.ENDC}")
+        delta = account.get_bool_option('delta_sync', False)
+        pages = self.iter_recorded_pages(account) if account.replay_file else self.iter_device_pages(account)
+        devices = {}
+        skipped = 0
+        for page in pages:
+            for device in page:
+                if device.hostname:
+                    devices[device.hostname] = device
+                else:
+                    skipped += 1
+
+        started = time.perf_counter()
+        report = {'devices': len(devices) + skipped, 'modified': {}, 'new': [], 'orphaned': [],
+                  'foreign': [], 'unchanged': 0, 'skipped': skipped}
+        account_id = str(account.account['_id'])
+        query = {'$or': [{'source_account_id': account_id}, {'hostname': {'$in': list(devices)}}]}
+        for db_host in Host.objects(__raw__=query):
+            hostname = db_host.hostname
+            device = devices.pop(hostname, None)
+            if device is None:
+                report['orphaned'].append(hostname)
+                continue
+            inventory_before, sync_id_before = dict(db_host.inventory), db_host.sync_id
+            status, _ = self._apply_device(account, db_host, device, delta)
+            if status == 'foreign':
+                report['foreign'].append(hostname)
                 continue
+            diff = self._inventory_diff(inventory_before, db_host.inventory)
+            if sync_id_before != db_host.sync_id:
+                diff['sync_id'] = [sync_id_before, db_host.sync_id]
+            if diff:
+                report['modified'][hostname] = diff
+            else:
+                report['unchanged'] += 1
+        report['new'] = sorted(devices)
+        report['orphaned'].sort()
+        report['foreign'].sort()
+        account.metrics.add_time('db', time.perf_counter() - started)
+        return report
 
+    @staticmethod
+    def _inventory_diff(before: Dict, after: Dict) -> Dict:
+        """Return the changed inventory fields as {field: [old, new]}."""
+        return {key: [before.get(key), after.get(key)] for key in sorted(before.keys() | after.keys())
+                if before.get(key) != after.get(key)}
+
+    def _log_dry_run_report(self, account: ExtremeCloudAccount, report: Dict) -> None:
+        """
+        Log the dry run report compactly: the totals, and at most 'dry_run_limit' hosts (default 20)
+        per category. The full report is written as JSON to the file named by 'dry_run_file', if set.
+        """
+        limit = max(account.get_int_option('dry_run_limit', 20), 0)
+        logger.info(f"ExtremeCloudIQ dry run: {report['devices']} devices, {len(report['modified'])} hosts would be "
+                    f"modified, {len(report['new'])} created, {report['unchanged']} unchanged, "
+                    f"{len(report['orphaned'])} orphaned, {len(report['foreign'])} owned by other source, "
+                    f"{report['skipped']} skipped")
+        for hostname, diff in list(report['modified'].items())[:limit]:
+            changes = ', '.join(f"{field}: {old!r} -> {new!r}" for field, (old, new) in diff.items())
+            logger.info(f"  ~ {hostname}: {changes}")
+        for category, sign in (('new', '+'), ('orphaned', '-'), ('foreign', '!')):
+            hostnames = report[category]
+            if hostnames:
+                more = f" (+{len(hostnames) - limit} more)" if len(hostnames) > limit else ''
+                logger.info(f"  {sign} {category}: {', '.join(hostnames[:limit])}{more}")
+        report_file = account.account.get('dry_run_file')
+        if report_file:
             try:
-                # Placeholder for interface endpoint (e.g., /devices/{device_id}/interfaces)
-                url = f"{self._API_PATH_INTERFACES_BASE}{db_host.sync_id}/interfaces"
-                response = account._make_api_request('GET', url)
-                interface_data = response.json().get('data', [])
+                with open(report_file, 'w', encoding='utf-8') as output:
+                    json.dump(report, output, indent=1, default=str)
+            except OSError as e:
+                logger.error(f"Could not write the dry run report to {report_file}: {e}")
 
-                if not isinstance(interface_data, list):
-                    logger.warning(f"Expected a list of interfaces for {db_host.hostname}, got: {type(interface_data)}")
-                    continue
+    def _log_sync_summary(self, account: ExtremeCloudAccount, log_wait_time: bool) -> None:
+        """
+        Log the host counters of the run, in high volume logging mode also the totals of the progress,
+        and write the summary as JSON to the file named by the account option 'summary_file'.
+        """
+        if log_wait_time:
+            logger.info(f"Waited {account.rate_limiter.wait_time:.1f}s on the rate limiter")
+        state = 'incomplete' if self.failed_page is not None else 'done'
+        logger.info(f"ExtremeCloudIQ sync {state}: {self.stats['modified']} hosts modified, "
+                    f"{self.stats['unchanged']} unchanged, {self.stats['foreign']} owned by other source")
+        summary = {
+            'account': account.account.get('name', account.state.account_id),
+            'state': state,
+            'finished': datetime.datetime.now().isoformat(timespec='seconds'),
+            'hosts': dict(self.stats),
+            'failed_page': self.failed_page,
+            'rate_limit_wait': round(account.rate_limiter.wait_time, 3),
+        }
+        progress, account.sync_progress = account.sync_progress, None
+        if progress is not None:
+            if self.failed_page is not None:
+                progress.add(errors=1)
+            progress.log_summary()
+            summary.update(progress.as_dict())
+        elif self.metrics is not None:
+            summary['seconds'] = round(self.metrics.timings['sync'], 3)
+        summary_file = account.account.get('summary_file')
+        if summary_file:
+            try:
+                tmp_path = f'{summary_file}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as output:
+                    json.dump(summary, output, indent=1)
+                os.replace(tmp_path, summary_file)
+            except OSError as e:
+                logger.error(f"Could not write the sync summary to {summary_file}: {e}")
 
-                interface_inventory = {}
-                for iface in interface_data:
-                    iface_id = iface.get('id')
-                    if not iface_id:
-                        logger.warning(f"Interface without ID for {db_host.hostname}, skipping: {iface}")
-                        continue
+    def _fetch_interfaces(self, account: ExtremeCloudAccount, sync_id: str) -> List[Dict]:
+        """Fetch the interfaces of one device."""
+        path = f"{self._API_PATH_INTERFACES_BASE}{sync_id}/interfaces"
+        interface_data = account._make_api_request('GET', path).json().get('data', [])
+        if not isinstance(interface_data, list):
+            raise Exception(f"Expected a list of interfaces, got: {type(interface_data)}")
+        return interface_data
+
+    def _fetch_interfaces_bulk(self, account: ExtremeCloudAccount, path: str,
+                               sync_ids: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Fetch the interfaces of several devices from a bulk endpoint, which must return the
+        interfaces of all given deviceIds with their 'device_id', paged with 'page' and 'limit'.
+
+        Pages are requested until a short page. If the endpoint ignores 'page' (it returns the
+        first page again), its answer may be cut off, so the devices are split in halves and
+        fetched again. Only devices with a complete answer are returned; a single device that
+        does not fit into one page is left out, so the caller counts it as failed.
+        """
+        limit = self._INTERFACE_BULK_LIMIT
+        interface_data = []
+        page = 0
+        while True:
+            params = {'deviceIds': sync_ids, 'page': page, 'limit': limit}
+            data = account._make_api_request('GET', path, params=params).json()
+            interfaces = data.get('data', [])
+            if not isinstance(interfaces, list):
+                raise Exception(f"Expected a list of interfaces, got: {type(interfaces)}")
+            if page > 0 and interfaces and interfaces[0] == interface_data[0]:
+                if len(sync_ids) == 1:
+                    logger.error(f"More than {limit} interfaces for device {sync_ids[0]}, skipping it")
+                    return {}
+                half = len(sync_ids) // 2
+                logger.debug(f"Interfaces of {len(sync_ids)} devices cut off at {limit}, splitting the request")
+                return {**self._fetch_interfaces_bulk(account, path, sync_ids[:half]),
+                        **self._fetch_interfaces_bulk(account, path, sync_ids[half:])}
+            interface_data.extend(interfaces)
+            total_pages = data.get('total_pages')
+            if len(interfaces) < limit or (total_pages and page + 1 >= total_pages):
+                break
+            page += 1
+        by_device = {sync_id: [] for sync_id in sync_ids}
+        for iface in interface_data:
+            device_id = str(iface.get('device_id', ''))
+            if device_id in by_device:
+                by_device[device_id].append(iface)
+        return by_device
 
-                    # Format MAC address if present
-                    mac = iface.get('mac_address')
-                    if mac:
-                        interface_inventory[f'{self._INVENTORY_PREFIX}interface_{iface_id}_mac'] = self._format_mac_address(mac)
+    def _flatten_interfaces(self, hostname: str, interface_data: List[Dict]) -> Dict:
+        """Flatten a list of interfaces into extremecloud_interface_<id>_<attr> inventory keys."""
+        interface_inventory = {}
+        for iface in interface_data:
+            iface_id = iface.get('id')
+            if not iface_id:
+                logger.warning(f"Interface without ID for {hostname}, skipping: {iface}")
+                continue
 
-                    # Map other interface attributes
-                    for attr in interface_attributes:
-                        if attr == 'mac_address':
-                            continue  # Already handled
-                        if attr in iface:
-                            interface_inventory[f'{self._INVENTORY_PREFIX}interface_{iface_id}_{attr}'] = iface[attr]
+            # Format MAC address if present
+            mac = iface.get('mac_address')
+            if mac:
+                interface_inventory[f'{self._INVENTORY_PREFIX}interface_{iface_id}_mac'] = self._format_mac_address(mac)
 
-                if interface_inventory:
-                    db_host.update_inventory(f'{self._INVENTORY_PREFIX}interface_', interface_inventory)
-                    db_host.save()
-                    logger.info(f"Updated interfaces for {db_host.hostname}")
+            # Map other interface attributes
+            for attr in self._INTERFACE_ATTRS:
+                if attr in iface:
+                    interface_inventory[f'{self._INVENTORY_PREFIX}interface_{iface_id}_{attr}'] = iface[attr]
+        return interface_inventory
+
+    def get_interfaces(self, account: ExtremeCloudAccount) -> Counter:
+        """
+        Fetch and update interface information for all devices of the account.
+
+        Devices are processed in batches of 'bulk_size' in sync_id order. Within a batch the
+        interfaces are fetched with up to 'interface_concurrency' parallel requests, or with
+        one request if the account option 'interfaces_bulk_path' names a bulk endpoint, and
+        the hosts are written with one bulk write. After every batch the position is stored
+        in the sync state, so a run that fails part way resumes after the last written batch;
+        devices whose fetch failed are retried on the next run. If a bulk write fails, the run
+        stops without moving the position past that batch. Devices to retry from the previous
+        run stay in the stored list until their batch is written.
+
+        Returns:
+            Counter: The number of 'updated', 'empty' and 'failed' devices, and of
+                'write_errors' if a bulk write failed.
+        """
+        logger.info(f"{ColorCodes.OKGREEN}Starting ExtremeCloudIQ Interface Sync{ColorCodes.ENDC}")
+        account_id = str(account.account['_id'])
+        batch_size = max(account.get_int_option('bulk_size', 1000), 1)
+        concurrency = max(account.get_int_option('interface_concurrency', account.page_concurrency), 1)
+        bulk_path = account.account.get('interfaces_bulk_path')
+        stats = Counter()
+
+        progress = account.state.get_many('interface_sync_cursor', 'interface_sync_failed')
+        cursor = progress.get('interface_sync_cursor')
+        retry_ids = progress.get('interface_sync_failed', [])
+        query = Host.objects(available=True, source_account_id=account_id, sync_id__nin=[None, ''])
+        if cursor:
+            logger.info(f"Resuming interface sync after device {cursor} ({len(retry_ids)} to retry)")
+            query = query.filter(__raw__={'$or': [{'sync_id': {'$gt': cursor}}, {'sync_id': {'$in': retry_ids}}]})
+        sync_ids = list(query.order_by('sync_id').scalar('sync_id'))
+        retry_ids = set(retry_ids)
+
+        failed = []
+        complete = True
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='extremecloud-if') as executor:
+            for start in range(0, len(sync_ids), batch_size):
+                batch = sync_ids[start:start + batch_size]
+                interfaces = {}
+                if bulk_path:
+                    try:
+                        interfaces = self._fetch_interfaces_bulk(account, bulk_path, batch)
+                    except Exception as e:
+                        logger.error(f"Error fetching interfaces for {len(batch)} devices: {e}")
                 else:
-                    logger.info(f"No interface data for {db_host.hostname}")
+                    futures = {sync_id: executor.submit(self._fetch_interfaces, account, sync_id)
+                               for sync_id in batch}
+                    for sync_id, future in futures.items():
+                        try:
+                            interfaces[sync_id] = future.result()
+                        except Exception as e:
+                            logger.error(f"Error fetching interfaces for device {sync_id}: {e}")
+                failed.extend(sync_id for sync_id in batch if sync_id not in interfaces)
 
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error fetching interfaces for {db_host.hostname}: {e}")
+                operations = []
+                batch_stats = Counter()
+                for db_host in Host.objects(source_account_id=account_id, sync_id__in=list(interfaces)):
+                    interface_inventory = self._flatten_interfaces(db_host.hostname, interfaces[db_host.sync_id])
+                    if not interface_inventory:
+                        batch_stats['empty'] += 1
+                        continue
+                    db_host.update_inventory(f'{self._INVENTORY_PREFIX}interface_', interface_inventory)
+                    operation = self._host_write_operation(db_host)
+                    if operation is not None:
+                        operations.append(operation)
+                    batch_stats['updated'] += 1
+                write_errors = self._bulk_write_hosts(operations)
+                if write_errors:
+                    # Keep the position before this batch, so the next run writes it again
+                    stats['write_errors'] += write_errors
+                    logger.error(f"Stopping the interface sync, {write_errors} hosts of the batch starting "
+                                 f"at device {batch[0]} could not be written")
+                    complete = False
+                    break
+                stats.update(batch_stats)
+                # Retries sort below the cursor, so those of later batches must stay in the stored list
+                retries_left = [sync_id for sync_id in sync_ids[start + len(batch):] if sync_id in retry_ids]
+                account.state.set(interface_sync_cursor=batch[-1], interface_sync_failed=failed + retries_left)
+                logger.info(f"Updated interfaces for {start + len(batch)} of {len(sync_ids)} devices")
+
+        stats['failed'] = len(failed)
+        if complete:
+            account.state.unset('interface_sync_cursor')
+            account.state.set(interface_sync_failed=failed)
+        else:
+            failed_ids = set(failed)
+            retries_left = [sync_id for sync_id in sync_ids[start:]
+                            if sync_id in retry_ids and sync_id not in failed_ids]
+            account.state.set(interface_sync_failed=failed + retries_left)
+        logger.info(f"{'Finished' if complete else 'Stopped'} ExtremeCloudIQ Interface Sync: {stats['updated']} updated, "
+                    f"{stats['empty']} without interfaces, {stats['failed']} failed")
+        return stats
+
+class ExtremeCloudSyncEngine:
+    """
+    Sync several ExtremeCloudIQ accounts concurrently from one asyncio event loop.
+
+    Each account streams its pages (see ExtremeCloudAPI.iter_device_pages) with up to
+    'page_concurrency' pages in flight. At most max_accounts accounts run at the same time,
+    and all accounts together send at most max_requests concurrent API requests. The
+    blocking HTTP and MongoDB calls run in separate thread pools, so the event loop is
+    never blocked and page fetching continues while a page is written. Accounts with the
+    option 'dry_run' enabled write nothing, their changes are logged as by inventorize.
+    """
+    def __init__(self, max_accounts: int = 4, max_requests: int = 16, db_workers: int = 4):
+        self.max_accounts = max(max_accounts, 1)
+        self.max_requests = max(max_requests, 1)
+        self.db_workers = max(db_workers, 1)
+
+    def run(self, accounts: List[dict]) -> Dict[str, object]:
+        """
+        Sync the given account configurations.
+
+        Returns:
+            Dict[str, object]: Per account name the ExtremeCloudSyncMetrics of its run,
+                or the exception that ended it.
+        """
+        return asyncio.run(self._run_all(accounts))
+
+    async def _run_all(self, accounts: List[dict]) -> Dict[str, object]:
+        request_slots = threading.BoundedSemaphore(self.max_requests)
+        account_slots = asyncio.Semaphore(self.max_accounts)
+        with ThreadPoolExecutor(max_workers=self.max_accounts, thread_name_prefix='extremecloud-io') as io_pool, \
+                ThreadPoolExecutor(max_workers=self.db_workers, thread_name_prefix='extremecloud-db') as db_pool:
+            runs = [self._sync_account(config, account_slots, request_slots, io_pool, db_pool)
+                    for config in accounts]
+            results = await asyncio.gather(*runs, return_exceptions=True)
+        return {config.get('name', str(config.get('_id'))): result for config, result in zip(accounts, results)}
+
+    async def _sync_account(self, config: dict, account_slots: asyncio.Semaphore,
+                            request_slots: threading.BoundedSemaphore,
+                            io_pool: ThreadPoolExecutor, db_pool: ThreadPoolExecutor) -> ExtremeCloudSyncMetrics:
+        async with account_slots:
+            loop = asyncio.get_running_loop()
+            account = ExtremeCloudAccount(config)
+            account.request_slots = request_slots
+            plugin = ExtremeCloudAPI()
+            if account.get_bool_option('dry_run', False):
+                plugin.dry_run_report = await loop.run_in_executor(io_pool, plugin.dry_run, account)
+                await loop.run_in_executor(db_pool, plugin._log_dry_run_report, account, plugin.dry_run_report)
+                return account.metrics
+
+            bulk = account.get_bool_option('bulk_writes', False)
+            delta = account.get_bool_option('delta_sync', False)
+            incremental = account.get_bool_option('incremental_sync', False)
+            since = None
+            if incremental:
+                since = await loop.run_in_executor(db_pool, plugin._incremental_since, account)
+            sync_started = time.time()
+            start_offset, fleet_started = await loop.run_in_executor(
+                db_pool, plugin._start_device_sync, account, since, sync_started)
+
+            if account.high_volume_logging:
+                account.sync_progress = ExtremeCloudSyncProgress('synced', account.progress_interval)
+            chunks = await loop.run_in_executor(io_pool, plugin._open_device_chunks,
+                                                account, since, True, bulk, start_offset)
+            newest_update = 0
+            while True:
+                try:
+                    devices = await loop.run_in_executor(io_pool, next, chunks, None)
+                except Exception:
+                    if plugin.failed_page is None:
+                        raise
+                    break
+                if devices is None:
+                    break
+                if incremental:
+                    newest_update = max(newest_update, plugin._newest_update_time(devices))
+                errors = plugin.stats['skipped'] + plugin.stats['write_errors']
+                await loop.run_in_executor(db_pool, plugin._process_devices, account, devices, bulk, delta)
+                if account.sync_progress is not None:
+                    account.sync_progress.add(len(devices), plugin.stats['skipped'] + plugin.stats['write_errors'] - errors)
+
+            await loop.run_in_executor(db_pool, plugin._finish_device_sync,
+                                       account, since, incremental, newest_update, fleet_started)
+            metrics = await loop.run_in_executor(db_pool, plugin._finish_metrics, account, sync_started)
+            await loop.run_in_executor(db_pool, plugin._log_sync_summary, account, True)
+            return metrics
+
+
+def _sync_account_process(config: dict) -> Tuple[Counter, ExtremeCloudSyncMetrics]:
+    """Run inventorize for one account in a worker process of ExtremeCloudSyncPool."""
+    plugin = ExtremeCloudAPI()
+    plugin.inventorize(ExtremeCloudAccount(config))
+    return plugin.stats, plugin.metrics
+
+
+def _sync_shard_process(config: dict, start_page: int,
+                        end_page: int) -> Tuple[Counter, ExtremeCloudSyncMetrics, Optional[int]]:
+    """Fetch and write the pages start_page to end_page of an account in a worker process of ExtremeCloudSyncPool."""
+    account = ExtremeCloudAccount(config)
+    plugin = ExtremeCloudAPI()
+    bulk = account.get_bool_option('bulk_writes', False)
+    delta = account.get_bool_option('delta_sync', False)
+    try:
+        for devices in plugin.iter_device_pages(account, start_page, end_page=end_page):
+            plugin._process_devices(account, devices, bulk, delta)
+    except Exception:
+        if plugin.failed_page is None:
+            raise
+    account.metrics.add_time('rate_limit_wait', account.rate_limiter.wait_time)
+    return plugin.stats, account.metrics, plugin.failed_page
+
+
+class ExtremeCloudSyncPool:
+    """
+    Sync with a pool of worker processes, to use more than one CPU core for JSON decoding,
+    device normalisation and building the host documents.
+
+    run_accounts syncs one account per worker. run_sharded splits the pages of one account
+    into one page range per worker and merges the host counters and metrics of the shards.
+    The workers are started with 'spawn', so each one imports the syncer application and
+    opens its own MongoDB connection and HTTP session; the auth token is shared through
+    the sync state (account option 'shared_token_cache').
+    """
+    def __init__(self, processes: Optional[int] = None, start_method: str = 'spawn'):
+        self.processes = max(processes or os.cpu_count() or 1, 1)
+        self.start_method = start_method
+
+    def _executor(self, workers: int) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(self.start_method))
+
+    def run_accounts(self, accounts: List[dict]) -> Dict[str, object]:
+        """
+        Sync the given account configurations in parallel processes.
+
+        Returns:
+            Dict[str, object]: Per account name the ExtremeCloudSyncMetrics of its run,
+                or the exception that ended it.
+        """
+        results = {}
+        with self._executor(min(self.processes, max(len(accounts), 1))) as executor:
+            futures = {config.get('name', str(config.get('_id'))): executor.submit(_sync_account_process, config)
+                       for config in accounts}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()[1]
+                except Exception as e:
+                    logger.error(f"Sync of account {name} failed: {e}")
+                    results[name] = e
+        return results
+
+    def run_sharded(self, config: dict, plugin: Optional[ExtremeCloudAPI] = None) -> ExtremeCloudSyncMetrics:
+        """
+        Run a full sync of one account with its pages split across the worker processes.
+
+        The coordinator reads the first page for the page count, starts one worker per range of
+        the remaining pages and writes the first page itself meanwhile. The account's 'rate_limit'
+        and the quota reported by the API are divided among the workers ('rate_limit_share'), and
+        all workers use the page size of the coordinator. Resume position, partial run handling
+        and page size tuning work as in ExtremeCloudAPI.inventorize, based on the first page that
+        failed in any shard.
+        Recording, replay, dry runs and incremental runs are not sharded and run in this process.
+        The host counters end up in plugin.stats.
+
+        Returns:
+            ExtremeCloudSyncMetrics: The merged metrics of all shards.
+        """
+        plugin = plugin or ExtremeCloudAPI()
+        account = ExtremeCloudAccount(config)
+        if account.replay_file or account.account.get('record_dir') \
+                or account.get_bool_option('dry_run', False) or account.get_bool_option('incremental_sync', False):
+            logger.info("Sync mode cannot be sharded, running it in this process")
+            plugin.inventorize(account)
+            return plugin.metrics
+
+        plugin.stats = Counter()
+        plugin.failed_page = None
+        account.start_run_metrics()
+        sync_started = time.time()
+        start_offset, fleet_started = plugin._start_device_sync(account, None, sync_started, record=False)
+        start_page = start_offset // plugin._page_size(account)
+        data, page_size = plugin._fetch_first_page(account, start_page)
+        total_pages = plugin._get_total_pages(data, page_size)
+        if total_pages is None:
+            logger.info("API reports no page count, running the sync in this process")
+            plugin.inventorize(account)
+            return plugin.metrics
+
+        pages = max(total_pages - start_page - 1, 0)  # Pages after the first one
+        workers = min(self.processes, max(pages, 1))
+        per_worker = max(-(-pages // workers), 1)
+        shard_config = dict(config, page_size=str(page_size),
+                            rate_limit=str(account.get_float_option('rate_limit', 2.0) / workers),
+                            rate_limit_share=str(1 / workers))
+        logger.info(f"{ColorCodes.OKGREEN}Starting ExtremeCloudIQ Device Sync with {workers} processes "
+                    f"({pages + 1} pages){ColorCodes.ENDC}")
+        failed_pages = []
+        with self._executor(workers) as executor:
+            shards = {first: executor.submit(_sync_shard_process, shard_config, first, first + per_worker)
+                      for first in range(start_page + 1, start_page + 1 + pages, per_worker)}
+            try:
+                devices = data.get('data', [])
+                if not isinstance(devices, list):
+                    raise Exception(f"Expected a list of devices on page {start_page}, got: {type(devices)}")
+                if devices:
+                    plugin._process_devices(account, ExtremeCloudDevice.from_page(account, devices),
+                                            account.get_bool_option('bulk_writes', False),
+                                            account.get_bool_option('delta_sync', False))
             except Exception as e:
-                logger.error(f"Unexpected error processing interfaces for {db_host.hostname}: {e}")
-    """
\ No newline at end of file
+                logger.error(f"Page {start_page} failed: {e}")
+                failed_pages.append(start_page)
+            for first, future in shards.items():
+                try:
+                    stats, metrics, failed_page = future.result()
+                except Exception as e:
+                    logger.error(f"Shard starting at page {first} failed: {e}")
+                    failed_pages.append(first)
+                    continue
+                plugin.stats.update(stats)
+                account.metrics.merge(metrics)
+                if failed_page is not None:
+                    failed_pages.append(failed_page)
+
+        plugin.failed_page = min(failed_pages, default=None)
+        plugin._finish_device_sync(account, None, False, 0, fleet_started)
+        metrics = plugin._finish_metrics(account, sync_started)
+        plugin._log_sync_summary(account, log_wait_time=True)
+        return metrics
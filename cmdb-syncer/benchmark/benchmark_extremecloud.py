@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the ExtremeCloudIQ syncer plugin
+
+Starts the local mock API (mock_extremecloud_api.py), then runs login, fetch_objects and
+inventorize of the plugin against it and reports devices/s, request counts, peak RSS and
+the time per phase. Must be run from the CMDBSyncer directory, so the plugin and its
+'application' package can be imported.
+
+With '--store memory' the hosts are written to an in-memory MongoDB (requires mongomock),
+with '--store mongodb' to the database configured for CMDBSyncer. Only use the latter with
+a test database: the benchmark creates one host per generated device (bench-ap-NNNNNN).
+
+Usage:
+    cd /var/www/cmdbsyncer
+    python3 benchmark_extremecloud.py --devices 40000 --latency 0.2 \\
+        --option page_concurrency=8 --option bulk_writes=true
+"""
+import argparse
+import importlib
+import json
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mock_extremecloud_api import MockExtremeCloudAPI  # pylint: disable=wrong-import-position
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MB."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / 1024 / 1024 if sys.platform == 'darwin' else usage / 1024
+
+
+def use_memory_store() -> None:
+    """Point the default MongoEngine connection to an in-memory mongomock database."""
+    import mongomock  # pylint: disable=import-outside-toplevel
+    from mongoengine import connect, disconnect  # pylint: disable=import-outside-toplevel
+    from application.models.host import Host  # pylint: disable=import-outside-toplevel
+    disconnect(alias='default')
+    connect('extremecloud_benchmark', alias='default', mongo_client_class=mongomock.MongoClient)
+    Host._collection = None  # pylint: disable=protected-access
+
+
+def parse_options(options) -> dict:
+    """Convert '--option key=value' arguments to account fields."""
+    result = {}
+    for option in options or []:
+        key, _, value = option.partition('=')
+        result[key.strip()] = value.strip()
+    return result
+
+
+class Phase:
+    """Context manager that records the duration and peak RSS of a benchmark phase."""
+    def __init__(self, report: dict, name: str):
+        self.report = report
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.report['phases'][self.name] = {
+            'seconds': round(time.perf_counter() - self.start, 3),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+
+
+def run(args) -> dict:
+    """Run the benchmark and return the report."""
+    plugin_module = importlib.import_module(args.plugin_module)
+    if args.store == 'memory' and not args.fetch_only:
+        use_memory_store()
+
+    api = MockExtremeCloudAPI(devices=args.devices, latency=args.latency, rate_429=args.rate_429,
+                              retry_after=args.retry_after, token_ttl=args.token_ttl,
+                              max_page_size=args.max_page_size, quota=args.quota)
+    url = api.start()
+    account_config = {
+        '_id': args.account_id,
+        'name': args.account_id,
+        'api_url': url,
+        'username': 'benchmark',
+        'password': 'benchmark',
+        'shared_token_cache': 'false' if args.fetch_only else 'true',
+    }
+    account_config.update(parse_options(args.option))
+    report = {'devices': args.devices, 'options': account_config, 'phases': {}}
+
+    try:
+        account = plugin_module.ExtremeCloudAccount(account_config)
+        plugin = plugin_module.ExtremeCloudAPI()
+
+        with Phase(report, 'login'):
+            account.get_auth_token()
+        with Phase(report, 'fetch_objects'):
+            fetched = len(plugin.fetch_objects(account))
+        report['fetched'] = fetched
+        if not args.fetch_only:
+            with Phase(report, 'inventorize'):
+                plugin.inventorize(account)
+            report['host_stats'] = dict(getattr(plugin, 'stats', {}))
+            if getattr(plugin, 'metrics', None) is not None:
+                report['plugin_metrics'] = plugin.metrics.as_dict()
+    finally:
+        api.stop()
+
+    report['requests'] = dict(api.stats)
+    report['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    fetch_seconds = report['phases']['fetch_objects']['seconds']
+    report['fetch_devices_per_second'] = round(fetched / fetch_seconds, 1) if fetch_seconds else None
+    if 'inventorize' in report['phases']:
+        sync_seconds = report['phases']['inventorize']['seconds']
+        report['sync_devices_per_second'] = round(args.devices / sync_seconds, 1) if sync_seconds else None
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(f"Devices:             {report['devices']} (fetched {report['fetched']})")
+    for name, phase in report['phases'].items():
+        print(f"Phase {name:<14} {phase['seconds']:>9.3f}s  peak RSS {phase['peak_rss_mb']:.1f} MB")
+    print(f"Fetch devices/s:     {report['fetch_devices_per_second']}")
+    if 'sync_devices_per_second' in report:
+        print(f"Sync devices/s:      {report['sync_devices_per_second']}")
+        print(f"Hosts:               {report['host_stats']}")
+    if 'plugin_metrics' in report:
+        print(f"Plugin timings:      {report['plugin_metrics']['timings']}")
+    print(f"Requests:            {report['requests']}")
+    print(f"Peak RSS:            {report['peak_rss_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ExtremeCloudIQ syncer plugin against a local mock API')
+    parser.add_argument('--plugin-module', default='application.plugins.extremecloud',
+                        help='Import path of ExtremeCloudSyncerPlugin.py inside CMDBSyncer')
+    parser.add_argument('--devices', type=int, default=10000, help='Fleet size of the mock API')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per /devices response')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Share of requests answered with 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After of injected 429s')
+    parser.add_argument('--token-ttl', type=float, default=None, help='Seconds until tokens expire (401)')
+    parser.add_argument('--max-page-size', type=int, default=100, help='Largest page size the mock accepts')
+    parser.add_argument('--quota', type=int, default=None, help='Requests per hour reported by the mock')
+    parser.add_argument('--store', choices=['memory', 'mongodb'], default='memory',
+                        help='Host store for inventorize (memory requires mongomock)')
+    parser.add_argument('--fetch-only', action='store_true', help='Skip inventorize, no database needed')
+    parser.add_argument('--account-id', default='extremecloud-benchmark', help='Account id/name used for the hosts')
+    parser.add_argument('--option', action='append', metavar='KEY=VALUE',
+                        help='Account option, e.g. page_concurrency=8 (repeatable)')
+    parser.add_argument('--json', metavar='FILE', help='Also write the report as JSON to FILE')
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+    if report['fetched'] < report['devices']:
+        # Timings of an incomplete fetch are meaningless, e.g. when the plugin could not start at all
+        print(f"Error: only {report['fetched']} of {report['devices']} devices fetched, see the log above",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
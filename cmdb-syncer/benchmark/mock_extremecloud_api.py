@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the ExtremeCloudIQ API
+
+Implements POST /login and the paginated GET /devices endpoint with a generated fleet, so the
+ExtremeCloudIQ syncer plugin can be benchmarked without touching the real cloud. Latency,
+429 rate limiting and 401 token expiry can be injected. Pages are numbered from 0, like the
+plugin requests them.
+
+Usage:
+    python3 mock_extremecloud_api.py --devices 40000 --latency 0.2 --port 8443
+"""
+import argparse
+import datetime
+import gzip
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+class MockExtremeCloudAPI:
+    """
+    Mock ExtremeCloudIQ API server running in a background thread.
+
+    Args:
+        devices (int): Size of the generated fleet.
+        latency (float): Seconds added to every /devices response.
+        rate_429 (float): Share of /devices requests answered with 429 (0.0 - 1.0).
+        retry_after (float): Retry-After value sent with injected 429 responses.
+        token_ttl (Optional[float]): Seconds until an issued token is rejected with 401.
+        max_page_size (int): Largest 'limit' the server honours, larger values are capped.
+        quota (Optional[int]): Requests allowed per quota window, reported in RateLimit-* headers.
+        quota_window (int): Length of the quota window in seconds.
+        seed (int): Seed for the 429 injection.
+    """
+    BASE_UPDATE_TIME = 1700000000  # Device i was last updated BASE_UPDATE_TIME + i seconds
+
+    def __init__(self, devices: int = 1000, latency: float = 0.0, rate_429: float = 0.0,
+                 retry_after: float = 1.0, token_ttl: Optional[float] = None, max_page_size: int = 100,
+                 quota: Optional[int] = None, quota_window: int = 3600, seed: int = 0):
+        self.devices = devices
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.token_ttl = token_ttl
+        self.max_page_size = max_page_size
+        self.quota = quota
+        self.quota_window = quota_window
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._tokens = {}
+        self._window_start = time.time()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start the server (port 0 picks a free port) and return its base URL."""
+        handler = type('Handler', (_MockHandler,), {'api': self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-extremecloud', daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def device(self, index: int) -> Dict:
+        """Return the generated device with the given index."""
+        update_time = datetime.datetime.fromtimestamp(self.BASE_UPDATE_TIME + index, tz=datetime.timezone.utc)
+        return {
+            'id': 100000000 + index,
+            'create_time': '2023-01-01T00:00:00.000Z',
+            'update_time': update_time.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'serial_number': f'SN{index:010d}',
+            'mac_address': f'{0x02AA00000000 + index:012X}',
+            'device_function': 'AP',
+            'product_type': 'AP_305C',
+            'hostname': f'bench-ap-{index:06d}',
+            'ip_address': f'10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}',
+            'software_version': '10.6.1.0',
+            'device_admin_state': 'MANAGED',
+            'connected': index % 10 != 0,
+            'last_connect_time': '2024-06-01T12:00:00.000Z',
+            'network_policy_name': 'Corporate',
+            'primary_dns_server_address': '10.0.0.53',
+            'primary_ntp_server_address': '10.0.0.123',
+            'subnet_mask': '255.255.0.0',
+            'default_gateway': '10.0.0.1',
+            'simulated': False,
+            'display_version': '10.6.1.0',
+            'active_clients': index % 40,
+            'location_id': 5000 + index % 100,
+            'locations': [{'id': 5000 + index % 100, 'name': f'Building {index % 100}'}],
+            'country_code': 276,
+            'description': 'Generated by mock_extremecloud_api',
+            'config_mismatch': False,
+            'managed_by': 'XIQ',
+            'system_up_time': 1717000000000 + index * 1000,
+            'mgt_vlan': 1,
+            'visible': True,
+        }
+
+    def issue_token(self) -> Dict:
+        """Create a new access token."""
+        with self._lock:
+            self.stats['login'] += 1
+            token = f"mock-token-{self.stats['login']}"
+            self._tokens[token] = time.time()
+        return {'access_token': token, 'token_type': 'Bearer', 'expires_in': 86400}
+
+    def check_token(self, authorization: Optional[str]) -> bool:
+        """Check a Bearer Authorization header against the issued, not expired tokens."""
+        if not authorization or not authorization.startswith('Bearer '):
+            return False
+        issued = self._tokens.get(authorization[7:])
+        if issued is None:
+            return False
+        return self.token_ttl is None or time.time() - issued < self.token_ttl
+
+    def take_quota(self) -> Dict[str, str]:
+        """Count a request against the quota window and return the RateLimit-* headers."""
+        if self.quota is None:
+            return {}
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.quota_window:
+                self._window_start = now
+                self.stats['quota_window_requests'] = 0
+            self.stats['quota_window_requests'] += 1
+            remaining = self.quota - self.stats['quota_window_requests']
+            reset = self.quota_window - (now - self._window_start)
+        return {
+            'RateLimit-Limit': f'{self.quota}, w={self.quota_window}',
+            'RateLimit-Remaining': str(max(remaining, 0)),
+            'RateLimit-Reset': str(int(reset) + 1),
+        }
+
+    def inject_429(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.rate_429
+
+    def devices_page(self, query: Dict) -> Dict:
+        """Build one /devices page for the given query parameters."""
+        page = int(query.get('page', ['0'])[0])
+        limit = min(int(query.get('limit', ['10'])[0]), self.max_page_size)
+        descending = query.get('sortOrder', [''])[0].upper() == 'DESC'
+        fields = [field.lower() for value in query.get('fields', []) for field in value.split(',')]
+        first = page * limit
+        indexes = range(first, min(first + limit, self.devices))
+        if descending:
+            indexes = [self.devices - 1 - index for index in indexes]
+        data = [self.device(index) for index in indexes]
+        if fields:
+            data = [{key: value for key, value in device.items() if key in fields} for device in data]
+        return {
+            'page': page,
+            'count': len(data),
+            'total_pages': -(-self.devices // limit),
+            'total_count': self.devices,
+            'data': data,
+        }
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    api = None  # Set by MockExtremeCloudAPI.start
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def _send_json(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode('utf-8')
+        gzipped = 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            payload = gzip.compress(payload, compresslevel=1)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.api.stats['bytes_sent'] += len(payload)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        if urlparse(self.path).path != '/login':
+            self._send_json(404, {'error': 'not found'})
+            return
+        try:
+            credentials = json.loads(body or b'{}')
+        except ValueError:
+            credentials = {}
+        if not credentials.get('username') or not credentials.get('password'):
+            self._send_json(401, {'error': 'missing credentials'})
+            return
+        self._send_json(200, self.api.issue_token())
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        url = urlparse(self.path)
+        if url.path != '/devices':
+            self._send_json(404, {'error': 'not found'})
+            return
+        api = self.api
+        api.stats['devices_requests'] += 1
+        if not api.check_token(self.headers.get('Authorization')):
+            api.stats['401'] += 1
+            self._send_json(401, {'error': 'token expired or invalid'})
+            return
+        headers = api.take_quota()
+        if api.quota is not None and headers['RateLimit-Remaining'] == '0':
+            api.stats['429'] += 1
+            self._send_json(429, {'error': 'quota exceeded'},
+                            dict(headers, **{'Retry-After': headers['RateLimit-Reset']}))
+            return
+        if api.inject_429():
+            api.stats['429'] += 1
+            self._send_json(429, {'error': 'rate limited'}, {'Retry-After': str(api.retry_after)})
+            return
+        if api.latency:
+            time.sleep(api.latency)
+        api.stats['pages_served'] += 1
+        self._send_json(200, api.devices_page(parse_qs(url.query)), headers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock of the ExtremeCloudIQ API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8443)
+    parser.add_argument('--devices', type=int, default=1000, help='Fleet size')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds per /devices response')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Share of requests answered with 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After of injected 429s')
+    parser.add_argument('--token-ttl', type=float, default=None, help='Seconds until tokens expire (401)')
+    parser.add_argument('--max-page-size', type=int, default=100, help='Largest accepted page size')
+    parser.add_argument('--quota', type=int, default=None, help='Requests per quota window')
+    parser.add_argument('--quota-window', type=int, default=3600, help='Quota window in seconds')
+    args = parser.parse_args()
+
+    api = MockExtremeCloudAPI(devices=args.devices, latency=args.latency, rate_429=args.rate_429,
+                              retry_after=args.retry_after, token_ttl=args.token_ttl,
+                              max_page_size=args.max_page_size, quota=args.quota,
+                              quota_window=args.quota_window)
+    print(f"Mock ExtremeCloudIQ API with {args.devices} devices on {api.start(args.host, args.port)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        api.stop()
+        print(f"Requests: {dict(api.stats)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+../../change_ssl_cert_linux_windows/extend_to__1000_hosts/library/bulk_csr.py
\ No newline at end of file